@@ -0,0 +1,56 @@
+"""
+Benchmark: subtree dedup cache on a corpus with repeated fragments.
+
+    PYTHONPATH=. python bench/bench_dedup.py
+"""
+import time
+from lxmlx.event import ENTER, EXIT, TEXT
+from lxmlx.subtree_hash import with_hash, dedup_transform, LRUCache
+
+
+def make_corpus(num_sections=20000, num_distinct=50, paragraphs=20):
+    yield {'type': ENTER, 'tag': 'doc'}
+    for i in range(num_sections):
+        yield {'type': ENTER, 'tag': 'section', 'attrib': {'kind': 'legal'}}
+        for j in range(paragraphs):
+            yield {'type': ENTER, 'tag': 'p'}
+            yield {'type': TEXT, 'text': 'Boilerplate clause %d.%d applies to all parties. ' % (i % num_distinct, j)}
+            yield {'type': EXIT}
+        yield {'type': EXIT}
+    yield {'type': EXIT}
+
+
+def expensive(events):
+    # stand-in for a costly per-subtree transform
+    result = []
+    for obj in events:
+        if obj['type'] == TEXT:
+            text = obj['text']
+            for _ in range(20):
+                text = text.swapcase()
+            obj = {'type': TEXT, 'text': text}
+        result.append(obj)
+    return result
+
+
+def select(obj):
+    return obj['tag'] == 'section'
+
+
+def run(label, fn):
+    t0 = time.perf_counter()
+    count = sum(1 for _ in fn())
+    elapsed = time.perf_counter() - t0
+    print('%-24s %8.3fs  %d events' % (label, elapsed, count))
+
+
+def main():
+    run('hash only', lambda: with_hash(make_corpus()))
+    run('no cache', lambda: dedup_transform(make_corpus(), select, expensive, cache=LRUCache(maxsize=1)))
+    cache = LRUCache(maxsize=256)
+    run('lru cache (256)', lambda: dedup_transform(make_corpus(), select, expensive, cache=cache))
+    print('hits=%d misses=%d hit_rate=%.3f' % (cache.hits, cache.misses, cache.hit_rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: per-node vs batch validation and escaping of text events.
+
+    PYTHONPATH=. python bench/bench_escape.py
+"""
+import io
+import time
+from lxmlx.event import ENTER, EXIT, TEXT
+from lxmlx.validate import validate_xml_text, xml_escape_text, \
+    validate_xml_texts, xml_escape_texts
+from lxmlx.xml_writer import XmlWriter
+
+
+def make_texts(count=1000000):
+    return ['word %d & <more>' % i if i % 10 == 0 else 'word %d' % i for i in range(count)]
+
+
+def make_events(texts):
+    events = [{'type': ENTER, 'tag': 'doc'}]
+    for text in texts:
+        events.append({'type': ENTER, 'tag': 'w'})
+        events.append({'type': TEXT, 'text': text})
+        events.append({'type': EXIT})
+    events.append({'type': EXIT})
+    return events
+
+
+def per_node(texts):
+    for text in texts:
+        validate_xml_text(text)
+        xml_escape_text(text)
+
+
+def batched(texts, batch_size=1024):
+    for i in range(0, len(texts), batch_size):
+        batch = texts[i:i+batch_size]
+        validate_xml_texts(batch)
+        xml_escape_texts(batch)
+
+
+def write_per_node(events):
+    writer = XmlWriter(io.BytesIO())
+    for obj in events:
+        writer.write_event(obj)
+
+
+def write_batched(events):
+    XmlWriter(io.BytesIO()).write_events(events)
+
+
+def run(label, fn, arg, count):
+    t0 = time.perf_counter()
+    fn(arg)
+    elapsed = time.perf_counter() - t0
+    print('%-28s %8.3fs  %6.0f ns/node' % (label, elapsed, elapsed / count * 1e9))
+
+
+def main():
+    texts = make_texts()
+    events = make_events(texts)
+    run('validate+escape per node', per_node, texts, len(texts))
+    run('validate+escape batched', batched, texts, len(texts))
+    run('XmlWriter per event', write_per_node, events, len(texts))
+    run('XmlWriter.write_events', write_batched, events, len(texts))
+
+
+if __name__ == '__main__':
+    main()
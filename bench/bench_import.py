@@ -0,0 +1,54 @@
+"""
+Benchmark: cold-start cost of importing lxmlx modules.
+
+    PYTHONPATH=. python bench/bench_import.py
+
+Each module is imported in a fresh interpreter, and the median of import
+times over several runs is reported. Lazily initialized modules are also
+timed up to their first use.
+"""
+import statistics
+import subprocess
+import sys
+
+RUNS = 15
+
+MODULES = [
+    'lxmlx',
+    'lxmlx.validate',
+    'lxmlx.event',
+    'lxmlx.xml_writer',
+    'lxml.etree',
+]
+
+FIRST_USE = [
+    ('lxmlx.validate', 'lxmlx.validate.validate_xml_text("a"); lxmlx.validate.validate_xml_name("a")'),
+]
+
+
+_CODE = '''
+import time
+start = time.perf_counter()
+import %s
+%s
+print(time.perf_counter() - start)
+'''
+
+
+def import_time(module, code='pass'):
+    times = []
+    for _ in range(RUNS):
+        out = subprocess.check_output([sys.executable, '-c', _CODE % (module, code)])
+        times.append(float(out))
+    return statistics.median(times)
+
+
+def main():
+    for module in MODULES:
+        print('%-32s %8.1f ms' % (module, import_time(module) * 1000))
+    for module, code in FIRST_USE:
+        print('%-32s %8.1f ms' % (module + ' (first use)', import_time(module, code) * 1000))
+
+
+if __name__ == '__main__':
+    main()
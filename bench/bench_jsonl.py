@@ -0,0 +1,63 @@
+"""
+Benchmark: JSON-lines codec vs per-event json.dumps / json.loads.
+
+    PYTHONPATH=. python bench/bench_jsonl.py
+"""
+import io
+import json
+import time
+from lxmlx.event import ENTER, EXIT, TEXT
+from lxmlx.jsonl import write_jsonl, read_jsonl
+
+
+def make_events(num_elements=300000):
+    events = [{'type': ENTER, 'tag': 'doc'}]
+    for i in range(num_elements):
+        events.append({'type': ENTER, 'tag': 'p', 'attrib': {'id': str(i)}})
+        events.append({'type': TEXT, 'text': 'Paragraph number %d' % i})
+        events.append({'type': EXIT})
+    events.append({'type': EXIT})
+    return events
+
+
+def dumps_per_event(events, target):
+    for obj in events:
+        target.write(json.dumps(obj).encode('utf-8') + b'\n')
+
+
+def loads_per_line(source):
+    return [json.loads(line) for line in source]
+
+
+def run(label, fn, count):
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    print('%-28s %8.3fs  %8.0f events/s' % (label, elapsed, count / elapsed))
+    return result
+
+
+def main():
+    events = make_events()
+    n = len(events)
+
+    out = io.BytesIO()
+    run('json.dumps per event', lambda: dumps_per_event(events, out), n)
+    plain = out.getvalue()
+
+    out = io.BytesIO()
+    run('write_jsonl', lambda: write_jsonl(events, out), n)
+    data = out.getvalue()
+
+    out = io.BytesIO()
+    run('write_jsonl (compact)', lambda: write_jsonl(events, out, compact=True), n)
+    compact = out.getvalue()
+    print('size: %.1f MB, compact: %.1f MB' % (len(data) / 1024 / 1024, len(compact) / 1024 / 1024))
+
+    run('json.loads per line', lambda: loads_per_line(io.BytesIO(plain)), n)
+    run('read_jsonl', lambda: list(read_jsonl(io.BytesIO(data))), n)
+    run('read_jsonl (compact)', lambda: list(read_jsonl(io.BytesIO(compact))), n)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: compiled 20-rule set vs equivalent chain of generators.
+
+    PYTHONPATH=. python bench/bench_rules.py
+"""
+import time
+from lxmlx.event import ENTER, EXIT, TEXT, with_peer
+from lxmlx.rules import compile_rules
+
+NUM_TAGS = 40
+
+
+def make_events(num_elements=200000):
+    events = [{'type': ENTER, 'tag': 'doc'}]
+    for i in range(num_elements):
+        events.append({'type': ENTER, 'tag': 't%d' % (i % NUM_TAGS), 'attrib': {'n': str(i)}})
+        events.append({'type': TEXT, 'text': 'text %d' % i})
+        events.append({'type': EXIT})
+    events.append({'type': EXIT})
+    return events
+
+
+def make_rules():
+    rules = []
+    for i in range(5):
+        rules.append({'tag': 't%d' % i, 'action': 'rename', 'to': 'r%d' % i})
+    for i in range(5, 10):
+        rules.append({'tag': 't%d' % i, 'action': 'drop'})
+    for i in range(10, 15):
+        rules.append({'tag': 't%d' % i, 'action': 'unwrap'})
+    for i in range(15, 20):
+        rules.append({'tag': 't%d' % i, 'action': 'set_attr', 'name': 'k', 'value': 'v'})
+    return rules
+
+
+# hand-written generators, one per rule, as they would be chained without
+# the rules engine
+
+def rename(events, tag, to):
+    for obj, peer in with_peer(events):
+        if obj['type'] == ENTER and obj['tag'] == tag:
+            obj = dict(obj, tag=to)
+        yield obj
+
+
+def drop(events, tag):
+    skip = 0
+    for obj, peer in with_peer(events):
+        if skip:
+            if obj['type'] == ENTER:
+                skip += 1
+            elif obj['type'] == EXIT:
+                skip -= 1
+            continue
+        if obj['type'] == ENTER and obj['tag'] == tag:
+            skip = 1
+            continue
+        yield obj
+
+
+def unwrap(events, tag):
+    for obj, peer in with_peer(events):
+        if obj['type'] == ENTER and obj['tag'] == tag:
+            continue
+        if obj['type'] == EXIT and peer['tag'] == tag:
+            continue
+        yield obj
+
+
+def set_attr(events, tag, name, value):
+    for obj, peer in with_peer(events):
+        if obj['type'] == ENTER and obj['tag'] == tag:
+            obj = dict(obj, attrib=dict(obj.get('attrib') or {}, **{name: value}))
+        yield obj
+
+
+def chain(events, rules):
+    for rule in rules:
+        if rule['action'] == 'rename':
+            events = rename(events, rule['tag'], rule['to'])
+        elif rule['action'] == 'drop':
+            events = drop(events, rule['tag'])
+        elif rule['action'] == 'unwrap':
+            events = unwrap(events, rule['tag'])
+        elif rule['action'] == 'set_attr':
+            events = set_attr(events, rule['tag'], rule['name'], rule['value'])
+    return events
+
+
+def run(label, fn):
+    t0 = time.perf_counter()
+    result = list(fn())
+    print('%-24s %8.3fs  %d events' % (label, time.perf_counter() - t0, len(result)))
+    return result
+
+
+def main():
+    events = make_events()
+    rules = make_rules()
+    transform = compile_rules(rules)
+
+    model = run('chained generators', lambda: chain(events, rules))
+    result = run('compiled rules', lambda: transform(events))
+    assert result == model
+
+
+if __name__ == '__main__':
+    main()
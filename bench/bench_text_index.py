@@ -0,0 +1,46 @@
+"""
+Benchmark: text offset index over a document with many elements.
+
+    PYTHONPATH=. python bench/bench_text_index.py
+"""
+import random
+import time
+from lxmlx.event import ENTER, EXIT, TEXT, text_of
+from lxmlx.text_index import index_text
+
+
+def make_events(num_elements=1000000):
+    events = [{'type': ENTER, 'tag': 'doc'}]
+    for i in range(num_elements // 2):
+        events.append({'type': ENTER, 'tag': 'p'})
+        events.append({'type': TEXT, 'text': 'Paragraph %d ' % i})
+        events.append({'type': ENTER, 'tag': 'b'})
+        events.append({'type': TEXT, 'text': 'bold'})
+        events.append({'type': EXIT})
+        events.append({'type': TEXT, 'text': '. '})
+        events.append({'type': EXIT})
+    events.append({'type': EXIT})
+    return events
+
+
+def main():
+    events = make_events()
+
+    t0 = time.perf_counter()
+    text = text_of(events)
+    print('text_of             %8.3fs' % (time.perf_counter() - t0))
+
+    t0 = time.perf_counter()
+    index = index_text(events)
+    print('index_text          %8.3fs  %d elements' % (time.perf_counter() - t0, len(index)))
+    assert index.text == text
+
+    offsets = [random.randrange(len(text)) for _ in range(100000)]
+    t0 = time.perf_counter()
+    for offset in offsets:
+        index.innermost(offset)
+    print('100k innermost()    %8.3fs' % (time.perf_counter() - t0))
+
+
+if __name__ == '__main__':
+    main()
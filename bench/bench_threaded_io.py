@@ -0,0 +1,103 @@
+"""
+Benchmark: background prefetch/write-behind over a throttled file, which
+stands in for a slow network filesystem.
+
+    PYTHONPATH=. python bench/bench_threaded_io.py
+
+Baseline collects XmlWriter output into large chunks in the main thread
+(writing to the throttled file directly is orders of magnitude slower, as
+XmlWriter issues a write per markup fragment).
+"""
+import io
+import time
+from lxmlx.event import parse, TEXT
+from lxmlx.xml_writer import XmlWriter
+from lxmlx.threaded_io import PrefetchReader, WriteBehind
+
+BANDWIDTH = 50 * 1024 * 1024  # bytes per second
+LATENCY   = 0.0002            # seconds per call
+
+
+class ThrottledFile:
+    """Sleeps on every call, like a file on a slow network share"""
+
+    def __init__(self, data=b''):
+        self._io = io.BytesIO(data)
+
+    def _throttle(self, size):
+        time.sleep(LATENCY + size / BANDWIDTH)
+
+    def read(self, size=-1):
+        data = self._io.read(size)
+        self._throttle(len(data))
+        return data
+
+    def write(self, data):
+        self._throttle(len(data))
+        return self._io.write(data)
+
+
+def make_document(num_records=20000):
+    return b'<doc>' + b''.join(
+        b'<rec id="%d"><name>Record &amp; %d</name><body>%s</body></rec>' % (i, i, b'lorem ipsum ' * 10)
+        for i in range(num_records)
+    ) + b'</doc>'
+
+
+def transform(events):
+    for obj in events:
+        if obj['type'] == TEXT:
+            obj = {'type': TEXT, 'text': obj['text'].upper()}
+        yield obj
+
+
+class ChunkedTarget:
+    """Collects writes into large chunks, without a background thread"""
+
+    def __init__(self, target, chunk_size=1024 * 1024):
+        self._target = target
+        self._chunk_size = chunk_size
+        self._pending = []
+        self._size = 0
+
+    def write(self, data):
+        self._pending.append(data)
+        self._size += len(data)
+        if self._size >= self._chunk_size:
+            self.flush()
+
+    def flush(self):
+        self._target.write(b''.join(self._pending))
+        self._pending = []
+        self._size = 0
+
+
+def chunked(data):
+    source = ThrottledFile(data)
+    target = ChunkedTarget(ThrottledFile())
+    XmlWriter(target).write_events(transform(parse(source)))
+    target.flush()
+
+
+def threaded(data, queue_depth):
+    with PrefetchReader(ThrottledFile(data), queue_depth=queue_depth) as source, \
+            WriteBehind(ThrottledFile(), queue_depth=queue_depth) as target:
+        XmlWriter(target).write_events(transform(parse(source)))
+
+
+def main():
+    data = make_document()
+    print('document size: %.1f MB' % (len(data) / 1024 / 1024))
+
+    t0 = time.perf_counter()
+    chunked(data)
+    print('%-28s %8.3fs' % ('chunked writes', time.perf_counter() - t0))
+
+    for queue_depth in (1, 4, 16):
+        t0 = time.perf_counter()
+        threaded(data, queue_depth)
+        print('%-28s %8.3fs' % ('threaded (queue_depth=%d)' % queue_depth, time.perf_counter() - t0))
+
+
+if __name__ == '__main__':
+    main()
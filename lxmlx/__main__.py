@@ -0,0 +1,4 @@
+import sys
+from lxmlx.cli import main
+
+sys.exit(main())
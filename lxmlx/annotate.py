@@ -0,0 +1,116 @@
+"""
+Streaming insertion of markup at flattened text offsets.
+
+Offsets refer to the flattened document text, i.e. what `text_of` returns
+for the same event stream (see also `lxmlx.text_index`).
+"""
+from lxmlx.event import ENTER, EXIT, TEXT
+
+
+def _span_enter(span):
+    obj = {'type': ENTER, 'tag': span[2]}
+    if span[3]:
+        obj['attrib'] = span[3]
+    return obj
+
+
+def annotate(events, spans):
+    """wraps text ranges into new elements.
+
+    `spans` is an iterable of (start, end, tag) or (start, end, tag, attrib)
+    tuples, sorted by `start` (spans with the same start should come in
+    decreasing order of `end` to nest properly). Memory use is proportional
+    to the document depth plus the number of simultaneously open spans.
+
+    Span elements are always placed inside the document elements. When a span
+    crosses ENTER or EXIT of a document element, it is split into several
+    span elements, one per contiguous piece of text. Likewise, overlapping
+    spans are split to keep the output well-formed. Spans of zero length
+    produce empty elements."""
+
+    spans = iter(spans)
+
+    def next_span():
+        span = next(spans, None)
+        if span is None:
+            return None
+        if len(span) == 3:
+            start, end, tag = span
+            attrib = None
+        else:
+            start, end, tag, attrib = span
+        if end < start:
+            raise ValueError('span end is before its start: ' + repr(span))
+        return start, end, tag, attrib
+
+    pending = next_span()
+    active = []   # spans covering current offset, in the order they were opened
+    emitted = 0   # how many of active spans are currently open in the output
+    pos = 0
+
+    for obj in events:
+        if obj['type'] == TEXT:
+            text = obj['text']
+            i = 0
+            n = len(text)
+            while True:
+                # close spans ending here (and re-open later those on top of them)
+                for k, span in enumerate(active):
+                    if span[1] <= pos:
+                        while emitted > k:
+                            yield {'type': EXIT}
+                            emitted -= 1
+                        active = [s for s in active if s[1] > pos]
+                        break
+
+                # activate spans starting here
+                while pending is not None and pending[0] <= pos:
+                    if pending[0] < pos:
+                        raise ValueError('spans are not sorted by start offset: ' + repr(pending[:3]))
+                    if pending[1] == pos:
+                        while emitted < len(active):
+                            yield _span_enter(active[emitted])
+                            emitted += 1
+                        yield _span_enter(pending)
+                        yield {'type': EXIT}
+                    else:
+                        active.append(pending)
+                    pending = next_span()
+
+                if i == n:
+                    break
+
+                stop = n
+                if pending is not None:
+                    stop = min(stop, pending[0] - pos + i)
+                for span in active:
+                    stop = min(stop, span[1] - pos + i)
+
+                while emitted < len(active):
+                    yield _span_enter(active[emitted])
+                    emitted += 1
+                yield {'type': TEXT, 'text': text[i:stop]}
+                pos += stop - i
+                i = stop
+
+        elif obj['type'] in (ENTER, EXIT):
+            while emitted:
+                yield {'type': EXIT}
+                emitted -= 1
+            if obj['type'] == ENTER:
+                yield obj
+            # empty spans are placed as early as possible, even if there is no
+            # text at this offset
+            while pending is not None and pending[0] == pos and pending[1] == pos:
+                yield _span_enter(pending)
+                yield {'type': EXIT}
+                pending = next_span()
+            if obj['type'] == EXIT:
+                yield obj
+
+        else:
+            yield obj
+
+    if active or pending is not None:
+        span = active[0] if active else pending
+        raise RuntimeError('span is out of the document text range: ' + repr(span[:3]))
@@ -0,0 +1,301 @@
+"""
+Command-line tool for streaming XML operations.
+
+    lxmlx cat input.xml.gz -o output.xml
+    lxmlx extract --tag record input.xml
+    lxmlx strip --tag b --tag i --drop script input.xml
+    lxmlx text input.xml
+    lxmlx to-jsonl input.xml > events.jsonl
+    lxmlx from-jsonl events.jsonl > output.xml
+    lxmlx text --jobs 8 --output-dir texts/ *.xml --stats
+
+Inputs are files (compressed files are decompressed on the fly) or stdin
+("-", the default). Output goes to stdout, to a file (`-o`, compressed if its
+extension says so), or, for several inputs, to a directory (`--output-dir`).
+Commands producing XML require `--output-dir` for several inputs, as
+concatenated documents would not be well-formed XML.
+"""
+import argparse
+import os
+import sys
+import time
+from lxmlx.event import parse, subtree, merge_text, ENTER, EXIT, TEXT
+from lxmlx.xml_writer import XmlWriter
+from lxmlx.jsonl import read_jsonl, write_jsonl
+from lxmlx.fanout import CountingTarget
+from lxmlx.compression import compression_from_filename, CompressingWriter
+
+_OUTPUT_EXTENSIONS = {
+    'cat'       : '.xml',
+    'extract'   : '.xml',
+    'strip'     : '.xml',
+    'text'      : '.txt',
+    'to-jsonl'  : '.jsonl',
+    'from-jsonl': '.xml',
+}
+
+_INPUT_EXTENSIONS = ('.gz', '.gzip', '.bz2', '.xz', '.zst', '.xml', '.jsonl', '.json')
+
+
+class _Counter:
+    """counts events passing through"""
+
+    def __init__(self, events):
+        self._events = iter(events)
+        self.count = 0
+
+    def __iter__(self):
+        for obj in self._events:
+            self.count += 1
+            yield obj
+
+
+def _input_events(args, source):
+    if args.command == 'from-jsonl':
+        return read_jsonl(source)
+    return parse(source)
+
+
+def _extract(events, tags):
+    events = iter(events)
+    for obj in events:
+        if obj['type'] == ENTER and obj['tag'] in tags:
+            yield obj
+            for x in subtree(events): yield x
+            yield {'type': EXIT}
+
+
+def _process(args, source, target):
+    """runs command over one input, returns number of input events"""
+
+    events = _Counter(_input_events(args, source))
+    command = args.command
+
+    if command in ('cat', 'from-jsonl'):
+        stream = merge_text(events) if args.merge_text else events
+        XmlWriter(target, xml_declaration=args.xml_declaration).write_events(stream)
+
+    elif command == 'extract':
+        events_iter = iter(events)
+        tags = set(args.tag)
+        writer = XmlWriter(target, xml_declaration=args.xml_declaration)
+        for root in events_iter:
+            if root['type'] == ENTER:
+                if root['tag'] in tags:
+                    # whole document is the only extracted subtree: it is
+                    # written as is (wrapped only if asked for)
+                    if args.wrap is not None:
+                        writer.write_enter(args.wrap)
+                    writer.write_event(root)
+                    writer.write_events(subtree(events_iter))
+                    writer.write_exit()
+                    if args.wrap is not None:
+                        writer.write_exit()
+                else:
+                    writer.write_event(root if args.wrap is None else {'type': ENTER, 'tag': args.wrap})
+                    writer.write_events(_extract(events_iter, tags))
+                    writer.write_exit()
+
+    elif command == 'strip':
+        from lxmlx.rules import compile_rules
+        rules = [{'tag': args.tag, 'action': 'unwrap'}] if args.tag else []
+        if args.drop:
+            rules.append({'tag': args.drop, 'action': 'drop'})
+        XmlWriter(target, xml_declaration=args.xml_declaration).write_events(
+            merge_text(compile_rules(rules)(events)))
+
+    elif command == 'text':
+        # written event by event, not to hold the whole text in memory
+        for obj in events:
+            if obj['type'] == TEXT:
+                target.write(obj['text'].encode('utf-8'))
+
+    elif command == 'to-jsonl':
+        stream = merge_text(events) if args.merge_text else events
+        write_jsonl(stream, target, compact=args.compact)
+
+    else:
+        assert False, command
+
+    return events.count
+
+
+def _output_name(args, filename):
+    base = os.path.basename(filename)
+    while True:
+        stem, ext = os.path.splitext(base)
+        if ext.lower() not in _INPUT_EXTENSIONS:
+            break
+        base = stem
+    return os.path.join(args.output_dir, base + _OUTPUT_EXTENSIONS[args.command])
+
+
+def _open_output(filename):
+    f = open(filename, 'wb')
+    compression = compression_from_filename(filename)
+    if compression is None:
+        return f, f.close
+    target = CompressingWriter(f, compression)
+    def close():
+        target.close()
+        f.close()
+    return target, close
+
+
+def _run_file(args, filename, target):
+    """processes one input, writing to `target` (or to a file in output
+    directory if `target` is None). Returns statistics tuple"""
+    source = sys.stdin.buffer if filename == '-' else filename
+    input_size = os.path.getsize(filename) if filename != '-' else 0
+
+    if target is None:
+        target, close = _open_output(_output_name(args, filename))
+    else:
+        close = lambda: None
+
+    from lxml.etree import XMLSyntaxError
+
+    counter = CountingTarget(target)
+    try:
+        num_events = _process(args, source, counter)
+    except XMLSyntaxError as e:
+        # lxml errors can not be passed back from worker processes
+        raise RuntimeError('%s: %s' % (filename, e))
+    finally:
+        close()
+    return num_events, input_size, counter.count
+
+
+def _run_job(job):
+    # runs in worker process, output goes to the output directory
+    args, filename = job
+    return _run_file(args, filename, None)
+
+
+def _peak_memory_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    )
+    return peak * scale / 1024 / 1024
+
+
+def _print_stats(num_files, num_events, input_size, output_size, elapsed):
+    mb = 1024 * 1024
+    elapsed = max(elapsed, 1e-9)
+    lines = [
+        'files:       %d' % num_files,
+        'events:      %d (%.0f events/s)' % (num_events, num_events / elapsed),
+        'input:       %.2f MB (%.2f MB/s)' % (input_size / mb, input_size / mb / elapsed),
+        'output:      %.2f MB (%.2f MB/s)' % (output_size / mb, output_size / mb / elapsed),
+        'time:        %.3f s' % elapsed,
+    ]
+    peak = _peak_memory_mb()
+    if peak is not None:
+        lines.append('peak memory: %.1f MB' % peak)
+    sys.stderr.write('\n'.join(lines) + '\n')
+
+
+def _parser():
+    parser = argparse.ArgumentParser(prog='lxmlx', description='Streaming XML operations')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    def add_command(name, help):
+        p = commands.add_parser(name, help=help)
+        p.add_argument('inputs', nargs='*', default=['-'], metavar='input',
+            help='input files ("-" for stdin, default)')
+        p.add_argument('-o', '--output', help='output file (default: stdout)')
+        p.add_argument('--output-dir', help='write output for each input into this directory')
+        p.add_argument('-j', '--jobs', type=int, default=1, help='number of parallel processes (requires --output-dir)')
+        p.add_argument('--stats', action='store_true', help='print throughput and peak memory to stderr')
+        return p
+
+    p = add_command('cat', 'parse and re-serialize XML')
+    p.add_argument('--merge-text', action='store_true', help='merge adjacent text events')
+    p.add_argument('--xml-declaration', action='store_true', help='write XML declaration')
+
+    p = add_command('extract', 'extract subtrees by tag')
+    p.add_argument('--tag', action='append', required=True, help='tag to extract (repeatable)')
+    p.add_argument('--wrap', help='wrapper element tag (default: copy of document root)')
+    p.add_argument('--xml-declaration', action='store_true', help='write XML declaration')
+
+    p = add_command('strip', 'strip tags, keeping their content')
+    p.add_argument('--tag', action='append', default=[], help='tag to strip (repeatable)')
+    p.add_argument('--drop', action='append', default=[], help='tag to remove with its content (repeatable)')
+    p.add_argument('--xml-declaration', action='store_true', help='write XML declaration')
+
+    add_command('text', 'dump text content')
+
+    p = add_command('to-jsonl', 'convert XML to JSON-lines events')
+    p.add_argument('--merge-text', action='store_true', help='merge adjacent text events')
+    p.add_argument('--compact', action='store_true', help='write events in compact (array) form')
+
+    p = add_command('from-jsonl', 'convert JSON-lines events to XML')
+    p.add_argument('--merge-text', action='store_true', help='merge adjacent text events')
+    p.add_argument('--xml-declaration', action='store_true', help='write XML declaration')
+
+    return parser
+
+
+def main(argv=None):
+    parser = _parser()
+    args = parser.parse_args(argv)
+
+    if args.jobs < 1:
+        parser.error('--jobs must be positive')
+    if args.output is not None and args.output_dir is not None:
+        parser.error('--output and --output-dir are mutually exclusive')
+    if args.jobs > 1 and args.output_dir is None:
+        # workers stream their output to files, never through this process
+        parser.error('--jobs requires --output-dir')
+    if args.output_dir is not None and '-' in args.inputs:
+        parser.error('--output-dir can not be used with stdin input')
+    if len(args.inputs) > 1 and args.output_dir is None and _OUTPUT_EXTENSIONS[args.command] == '.xml':
+        # several XML documents in one stream would not be well-formed
+        parser.error(args.command + ' of several inputs requires --output-dir')
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    num_events = input_size = output_size = 0
+
+    if args.output_dir is not None:
+        target, close = None, lambda: None
+    elif args.output is not None:
+        target, close = _open_output(args.output)
+    else:
+        target, close = sys.stdout.buffer, sys.stdout.buffer.flush
+
+    try:
+        if args.jobs == 1 or len(args.inputs) == 1:
+            for filename in args.inputs:
+                e, i, o = _run_file(args, filename, target)
+                num_events += e
+                input_size += i
+                output_size += o
+        else:
+            import multiprocessing
+            with multiprocessing.Pool(args.jobs) as pool:
+                jobs = [(args, filename) for filename in args.inputs]
+                for e, i, o in pool.imap(_run_job, jobs):
+                    num_events += e
+                    input_size += i
+                    output_size += o
+    except (OSError, RuntimeError, ValueError) as e:
+        sys.stderr.write('lxmlx: error: ' + str(e) + '\n')
+        return 1
+    finally:
+        close()
+
+    if args.stats:
+        _print_stats(len(args.inputs), num_events, input_size, output_size,
+            time.perf_counter() - start)
+
+    return 0
@@ -0,0 +1,229 @@
+"""
+Streaming compression support for `parse` and `XmlWriter`.
+
+Supported codecs: 'gzip', 'bz2', 'xz' (Python standard library) and 'zstd'
+(requires optional `zstandard` package).
+"""
+import os
+
+_MAGIC = [
+    (b'\x1f\x8b',            'gzip'),
+    (b'BZh',                 'bz2'),
+    (b'\xfd7zXZ\x00',        'xz'),
+    (b'\x28\xb5\x2f\xfd',    'zstd'),
+]
+
+_EXTENSIONS = {
+    '.gz'  : 'gzip',
+    '.gzip': 'gzip',
+    '.bz2' : 'bz2',
+    '.xz'  : 'xz',
+    '.zst' : 'zstd',
+}
+
+COMPRESSIONS = ('gzip', 'bz2', 'xz', 'zstd')
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError('zstd compression requires "zstandard" package (pip install zstandard)')
+    return zstandard
+
+
+def _fspath(path):
+    # os.fspath() is not available in Python 3.5
+    if hasattr(path, '__fspath__'):
+        return path.__fspath__()
+    return path
+
+
+def compression_from_filename(filename):
+    """guesses compression by filename extension, returns None for
+    uncompressed files"""
+    filename = _fspath(filename)
+    if isinstance(filename, bytes):
+        filename = os.fsdecode(filename)
+    _, ext = os.path.splitext(filename)
+    return _EXTENSIONS.get(ext.lower())
+
+
+def compression_from_header(header):
+    """detects compression by the magic bytes at the start of a file, returns
+    None for uncompressed data"""
+    for magic, compression in _MAGIC:
+        if header.startswith(magic):
+            return compression
+    return None
+
+
+def decompressing_reader(fileobj, compression):
+    """wraps binary file object with a streaming decompressor"""
+    if compression == 'gzip':
+        import gzip
+        return gzip.GzipFile(fileobj=fileobj, mode='rb')
+    elif compression == 'bz2':
+        import bz2
+        return bz2.BZ2File(fileobj, mode='rb')
+    elif compression == 'xz':
+        import lzma
+        return lzma.LZMAFile(fileobj, mode='rb')
+    elif compression == 'zstd':
+        return _zstandard().ZstdDecompressor().stream_reader(fileobj, read_across_frames=True)
+    else:
+        raise ValueError('unknown compression: ' + repr(compression))
+
+
+class _PeekReader:
+    """Wraps binary file object that does not support `peek`, so that the
+    start of the stream can be inspected without consuming it"""
+
+    def __init__(self, source):
+        self._source = source
+        self._head = b''
+
+    def peek(self, size):
+        while len(self._head) < size:
+            data = self._source.read(size - len(self._head))
+            if not data:
+                break
+            self._head += data
+        return self._head
+
+    def read(self, size=-1):
+        if not self._head:
+            return self._source.read(size)
+        if size is None or size < 0:
+            data, self._head = self._head + self._source.read(), b''
+        else:
+            data, self._head = self._head[:size], self._head[size:]
+        return data
+
+    def __iter__(self):
+        head, self._head = self._head, b''
+        lines = iter(self._source)
+        if head:
+            # peeked bytes may end in the middle of a line
+            data = head + next(lines, b'')
+            for line in data.split(b'\n')[:-1]:
+                yield line + b'\n'
+            if not data.endswith(b'\n'):
+                yield data[data.rfind(b'\n')+1:]
+        for line in lines: yield line
+
+    def readable(self):
+        return True
+
+
+def open_input(source):
+    """opens `source` (filename, str or bytes, or binary file object) for
+    parsing, decompressing it on the fly if needed. Compression is detected
+    by magic bytes, or by filename extension.
+
+    Returns tuple (source, close). `source` is either the original filename
+    (uncompressed files are best read by libxml2 directly) or a binary file
+    object; `close` is a function to release resources."""
+
+    source = _fspath(source)
+    if isinstance(source, (str, bytes)):
+        f = open(source, 'rb')
+        compression = compression_from_header(f.peek(6)[:6]) or compression_from_filename(source)
+        if compression is None:
+            f.close()
+            return source, lambda: None
+        reader = decompressing_reader(f, compression)
+        def close():
+            reader.close()
+            f.close()
+        return reader, close
+
+    if not hasattr(source, 'peek'):
+        source = _PeekReader(source)
+    compression = compression_from_header(source.peek(6)[:6])
+    if compression is not None:
+        reader = decompressing_reader(source, compression)
+        return reader, reader.close
+
+    return source, lambda: None
+
+
+class _Compressor:
+
+    def __init__(self, compression, level, threads):
+        if compression == 'gzip':
+            import zlib
+            # wbits=31 selects gzip container
+            self._obj = zlib.compressobj(
+                zlib.Z_DEFAULT_COMPRESSION if level is None else level,
+                zlib.DEFLATED,
+                31
+            )
+        elif compression == 'bz2':
+            import bz2
+            self._obj = bz2.BZ2Compressor(9 if level is None else level)
+        elif compression == 'xz':
+            import lzma
+            self._obj = lzma.LZMACompressor(preset=level)
+        elif compression == 'zstd':
+            zstandard = _zstandard()
+            self._obj = zstandard.ZstdCompressor(
+                level=3 if level is None else level,
+                threads=threads or 0
+            ).compressobj()
+        else:
+            raise ValueError('unknown compression: ' + repr(compression))
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+
+class CompressingWriter:
+    """Binary file-like object, that compresses data written to it in large
+    chunks and writes the result to `target`.
+
+    `level` is the codec compression level (codec default if None),
+    `threads` is the number of compression threads (zstd only).
+    Call `close` to finish the compressed stream; target is not closed."""
+
+    def __init__(self, target, compression, level=None, threads=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        if threads and compression != 'zstd':
+            raise ValueError('threads are only supported by zstd compression')
+        self._target = target
+        self._compressor = _Compressor(compression, level, threads)
+        self._chunk_size = chunk_size
+        self._pending = []
+        self._pending_size = 0
+        self._closed = False
+
+    def _compress_pending(self):
+        if self._pending:
+            data = self._compressor.compress(b''.join(self._pending))
+            self._pending = []
+            self._pending_size = 0
+            if data:
+                self._target.write(data)
+
+    def write(self, data):
+        if self._closed:
+            raise ValueError('write to closed CompressingWriter')
+        self._pending.append(data)
+        self._pending_size += len(data)
+        if self._pending_size >= self._chunk_size:
+            self._compress_pending()
+        return len(data)
+
+    def writable(self):
+        return True
+
+    def close(self):
+        if self._closed:
+            return
+        self._compress_pending()
+        self._target.write(self._compressor.flush())
+        self._closed = True
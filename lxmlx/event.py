@@ -10,7 +10,11 @@ Events representation is intentionally very portable. Lists of events
 can are JSON-serializable. This provides an alrernative way to serialize
 XMl documents.
 """
-import lxml.etree as et
+from lxmlx.compression import open_input
+
+# lxml is loaded on first use (see `_etree`): event constants and stream
+# helpers (used by `lxmlx.xml_writer`) should not pay for loading lxml
+et = None
 
 ENTER   = 'enter'
 EXIT    = 'exit'
@@ -18,6 +22,13 @@ TEXT    = 'text'
 COMMENT = 'comment'
 PI      = 'pi'
 
+def _etree():
+    global et
+    if et is None:
+        import lxml.etree
+        et = lxml.etree
+    return et
+
 def _obj2elt(obj, nsmap=None):
     return et.Element(obj['tag'], attrib=obj.get('attrib'), nsmap=nsmap)
 
@@ -29,7 +40,10 @@ def _elt2obj(elt):
 
 def scan(xml):
     """Converts XML tree to event generator"""
+    _etree()
+    return _scan(xml)
 
+def _scan(xml):
     if xml.tag is et.Comment:
         yield {'type': COMMENT, 'text': xml.text}
         return
@@ -50,7 +64,7 @@ def scan(xml):
         yield {'type': TEXT, 'text': xml.text}
 
     for c in xml:
-        for x in scan(c): yield x
+        for x in _scan(c): yield x
         if c.tail:
             yield {'type': TEXT, 'text': c.tail}
 
@@ -58,6 +72,7 @@ def scan(xml):
 
 def unscan(events, nsmap=None):
     """Converts events stream into lXML tree"""
+    _etree()
 
     root = None
     last_closed_elt = None
@@ -107,25 +122,35 @@ def unscan(events, nsmap=None):
 
 
 def parse(filename):
-    """Parses file content into events stream"""
-    for event, elt in et.iterparse(filename, events= ('start', 'end', 'comment', 'pi'), huge_tree=True):
-        if event == 'start':
-            obj = _elt2obj(elt)
-            obj['type'] = ENTER
-            yield obj
-            if elt.text:
-                yield {'type': TEXT, 'text': elt.text}
-        elif event == 'end':
-            yield {'type': EXIT}
-            if elt.tail:
-                yield {'type': TEXT, 'text': elt.tail}
-            elt.clear()
-        elif event == 'comment':
-            yield {'type': COMMENT, 'text': elt.text}
-        elif event == 'pi':
-            yield {'type': PI, 'text': elt.text}
-        else:
-            assert False, (event, elt)
+    """Parses file content into events stream. Accepts filename or binary
+    file object (see also `lxmlx.threaded_io.PrefetchReader`). Compressed
+    input is decompressed on the fly (see `lxmlx.compression.open_input`)"""
+    _etree()
+    source, close = open_input(filename)
+    try:
+        for event, elt in et.iterparse(source, events= ('start', 'end', 'comment', 'pi'), huge_tree=True):
+            if event == 'start':
+                obj = _elt2obj(elt)
+                obj['type'] = ENTER
+                yield obj
+                if elt.text:
+                    yield {'type': TEXT, 'text': elt.text}
+            elif event == 'end':
+                yield {'type': EXIT}
+                if elt.tail:
+                    yield {'type': TEXT, 'text': elt.tail}
+                elt.clear()
+            elif event == 'comment':
+                yield {'type': COMMENT, 'text': elt.text}
+            elif event == 'pi':
+                if elt.text:
+                    yield {'type': PI, 'target': elt.target, 'text': elt.text}
+                else:
+                    yield {'type': PI, 'target': elt.target}
+            else:
+                assert False, (event, elt)
+    finally:
+        close()
 
 def subtree(events):
     """selects sub-tree events"""
@@ -171,4 +196,4 @@ def with_peer(events):
 
 def text_of(events):
     """extracts text content from event stream"""
-    return ''.join(o['text'] for o in events if o['type']==TEXT)
+    return ''.join([o['text'] for o in events if o['type']==TEXT])
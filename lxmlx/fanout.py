@@ -0,0 +1,175 @@
+"""
+Writing one event stream to several outputs.
+"""
+import collections
+from lxmlx.event import ENTER, EXIT
+from lxmlx.xml_writer import XmlWriter
+
+
+def fan_out(events, *consumers):
+    """passes every event to each of the consumers (callables accepting an
+    event, e.g. `XmlWriter.write_event` or `RoutingWriter.write_event`).
+
+    Stream is consumed once and is never materialized."""
+    for obj in events:
+        for consumer in consumers:
+            consumer(obj)
+
+
+class TeeTarget:
+    """Binary file-like object that duplicates all writes to several targets.
+
+    Use it as `XmlWriter` target to write identical output to several files:
+    the event stream is then serialized (names resolved, text validated and
+    escaped) only once."""
+
+    def __init__(self, *targets):
+        self._targets = targets
+
+    def write(self, data):
+        for target in self._targets:
+            target.write(data)
+        return len(data)
+
+    def flush(self):
+        for target in self._targets:
+            if hasattr(target, 'flush'):
+                target.flush()
+
+
+class CountingTarget:
+    """Binary file-like object that passes writes through to `target`,
+    counting bytes written (`count`)"""
+
+    def __init__(self, target):
+        self.target = target
+        self.count = 0
+
+    def write(self, data):
+        self.count += len(data)
+        return self.target.write(data)
+
+
+class _Output:
+
+    def __init__(self, fileobj, xml_declaration, root, nsmap):
+        self.fileobj = fileobj
+        self.counter = CountingTarget(fileobj)
+        self.writer = XmlWriter(self.counter, xml_declaration=xml_declaration)
+        self.root = root
+        if root is not None:
+            self.writer.write_event(root, nsmap=nsmap)
+
+    def close(self):
+        if self.root is not None:
+            self.writer.write_exit()
+        self.fileobj.close()
+
+
+class RoutingWriter:
+    """Dispatches subtrees of an event stream to different files.
+
+    For every ENTER event (except the document root) outside of already
+    routed subtree, `route(obj)` is called. If it returns a key (not None),
+    the whole subtree goes to the output for that key, otherwise event is
+    skipped and routing proceeds into its content. All events outside of
+    routed subtrees are dropped.
+
+    Outputs are opened by calling `opener(key, part)` which must return a
+    binary file object (writer closes it when done). In each output, routed
+    subtrees are wrapped into a copy of the document root element (unless
+    `wrap=False`).
+
+    At most `max_open` outputs are kept open, least recently used output is
+    closed when this limit is exceeded. An output is also closed after a
+    subtree brings its size to `max_bytes` or more. Next subtree for the same
+    key then goes to a new output, with `part` incremented.
+    """
+
+    def __init__(self, opener, route, max_open=16, max_bytes=None, wrap=True,
+            xml_declaration=False, nsmap=None):
+        if max_open <= 0:
+            raise ValueError('max_open must be positive')
+        self._opener = opener
+        self._route = route
+        self._max_open = max_open
+        self._max_bytes = max_bytes
+        self._wrap = wrap
+        self._xml_declaration = xml_declaration
+        self._nsmap = nsmap
+
+        self._root = None
+        self._depth = 0
+        self._outputs = collections.OrderedDict()
+        self._parts = {}
+        self._current = None
+        self._current_key = None
+        self._current_depth = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *av):
+        self.close()
+
+    def _open(self, key):
+        output = self._outputs.get(key)
+        if output is not None:
+            self._outputs.move_to_end(key)
+            return output
+
+        part = self._parts.get(key, 0)
+        self._parts[key] = part + 1
+        output = _Output(self._opener(key, part), self._xml_declaration,
+            self._root if self._wrap else None, self._nsmap)
+        self._outputs[key] = output
+
+        while len(self._outputs) > self._max_open:
+            _, old = self._outputs.popitem(last=False)
+            old.close()
+
+        return output
+
+    def write_event(self, obj):
+        if self._current is not None:
+            self._current.writer.write_event(obj, nsmap=self._nsmap)
+            if obj['type'] == ENTER:
+                self._current_depth += 1
+            elif obj['type'] == EXIT:
+                self._current_depth -= 1
+                if self._current_depth == 0:
+                    if self._max_bytes is not None and self._current.counter.count >= self._max_bytes:
+                        del self._outputs[self._current_key]
+                        self._current.close()
+                    self._current = None
+                    self._current_key = None
+            return
+
+        if obj['type'] == ENTER:
+            self._depth += 1
+            if self._root is None:
+                self._root = obj
+                return
+            key = self._route(obj)
+            if key is not None:
+                self._depth -= 1
+                self._current_key = key
+                self._current = self._open(key)
+                self._current_depth = 1
+                self._current.writer.write_event(obj, nsmap=self._nsmap)
+        elif obj['type'] == EXIT:
+            self._depth -= 1
+            if self._depth < 0:
+                raise RuntimeError('Unbalanced XML event stream')
+
+    def write_events(self, events):
+        for obj in events:
+            self.write_event(obj)
+
+    def close(self):
+        """closes all open outputs"""
+        while self._outputs:
+            _, output = self._outputs.popitem(last=False)
+            output.close()
+        self._current = None
+        self._current_key = None
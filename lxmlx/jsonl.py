@@ -0,0 +1,133 @@
+"""
+JSON-lines codec for event streams: one JSON-encoded event per line.
+
+Besides the regular (dict) form of events, a compact form is supported, where
+each event is a JSON array:
+
+* `["e", tag]` or `["e", tag, attrib]` - ENTER
+* `["x"]` - EXIT
+* `["t", text]` - TEXT
+* `["c", text]` - COMMENT
+* `["p", target]` or `["p", target, text]` - PI
+
+Reader accepts both forms (even mixed in one file).
+"""
+import itertools
+import json
+import sys
+from lxmlx.event import ENTER, EXIT, TEXT, COMMENT, PI
+from lxmlx.compression import open_input
+
+DEFAULT_BATCH_SIZE = 1024
+
+_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), check_circular=False)
+_DECODER = json.JSONDecoder()
+
+
+def _compact(obj):
+    t = obj['type']
+    if t == TEXT:
+        return ['t', obj['text']]
+    elif t == ENTER:
+        if obj.get('attrib'):
+            return ['e', obj['tag'], obj['attrib']]
+        return ['e', obj['tag']]
+    elif t == EXIT:
+        return ['x']
+    elif t == COMMENT:
+        return ['c', obj['text']]
+    elif t == PI:
+        if obj.get('text'):
+            return ['p', obj['target'], obj['text']]
+        return ['p', obj['target']]
+    else:
+        assert False, obj
+
+
+def write_jsonl(events, target, compact=False, batch_size=DEFAULT_BATCH_SIZE):
+    """writes events to binary file object `target` as JSON lines.
+    Events are encoded and written in batches of `batch_size`"""
+
+    encode = _ENCODER.encode
+    events = iter(events)
+    if compact:
+        events = map(_compact, events)
+
+    while True:
+        batch = list(itertools.islice(events, batch_size))
+        if not batch:
+            break
+        target.write(('\n'.join(map(encode, batch)) + '\n').encode('utf-8'))
+
+
+def _normalize(obj, intern):
+    if type(obj) is list:
+        t = obj[0]
+        if t == 't':
+            return {'type': TEXT, 'text': obj[1]}
+        elif t == 'e':
+            out = {'type': ENTER, 'tag': intern(obj[1])}
+            if len(obj) > 2 and obj[2]:
+                out['attrib'] = {intern(k): v for k, v in obj[2].items()}
+            return out
+        elif t == 'x':
+            return {'type': EXIT}
+        elif t == 'c':
+            return {'type': COMMENT, 'text': obj[1]}
+        elif t == 'p':
+            out = {'type': PI, 'target': obj[1]}
+            if len(obj) > 2:
+                out['text'] = obj[2]
+            return out
+        else:
+            raise RuntimeError('unknown compact event type: ' + repr(t))
+
+    if obj['type'] == ENTER:
+        obj['tag'] = intern(obj['tag'])
+        attrib = obj.get('attrib')
+        if attrib:
+            obj['attrib'] = {intern(k): v for k, v in attrib.items()}
+    return obj
+
+
+def _read(source, intern, batch_size):
+    intern = sys.intern if intern else (lambda x: x)
+    raw_decode = _DECODER.raw_decode
+    lineno = 0
+    while True:
+        chunk = list(itertools.islice(source, batch_size))
+        if not chunk:
+            break
+        for line in chunk:
+            lineno += 1
+            line = line.strip()
+            if not line:
+                continue
+            # every line must hold exactly one JSON value
+            try:
+                text = line.decode('utf-8')
+                obj, end = raw_decode(text)
+            except ValueError as e:
+                raise ValueError('invalid JSON on line %d: %s' % (lineno, e))
+            if end != len(text):
+                raise ValueError('invalid JSON on line %d: extra data at column %d' % (lineno, end + 1))
+            yield _normalize(obj, intern)
+
+
+def read_jsonl(source, intern=True, batch_size=DEFAULT_BATCH_SIZE):
+    """reads events from JSON lines. Accepts filename or binary file object
+    (compressed input is decompressed on the fly).
+
+    Lines are read in batches of `batch_size`. If `intern` is set, tags and
+    attribute names are interned, saving memory on large streams. A line that
+    does not hold exactly one JSON value raises ValueError with its number."""
+
+    source, close = open_input(source)
+    try:
+        if isinstance(source, str):
+            with open(source, 'rb') as f:
+                for obj in _read(iter(f), intern, batch_size): yield obj
+        else:
+            for obj in _read(iter(source), intern, batch_size): yield obj
+    finally:
+        close()
@@ -0,0 +1,213 @@
+"""
+Declarative transformation rules over event stream.
+
+Rules are dicts (JSON-serializable, like events). Match part of a rule:
+
+* `tag` - element tag, or list of tags (any element if omitted)
+* `attrib` - optional dictionary of attributes the element must have. Value
+  None matches any attribute value.
+* `ancestors` - optional list of ancestor tags, outermost first, that must
+  match immediate ancestors of the element (parent last). Use `'*'` to match
+  any tag.
+
+Action part of a rule:
+
+* `{"action": "rename", "to": <tag>}` - renames element
+* `{"action": "drop"}` - removes element together with its content
+* `{"action": "unwrap"}` - removes element markup, keeping its content
+* `{"action": "set_attr", "name": <name>, "value": <value>}` - sets attribute
+  (value None removes it)
+* `{"action": "replace_text", "text": <text>}` - replaces element content
+  with the given text
+
+Example:
+```python
+transform = compile_rules([
+    {'tag': 'b', 'action': 'rename', 'to': 'strong'},
+    {'tag': ['script', 'style'], 'action': 'drop'},
+    {'tag': 'a', 'attrib': {'href': None}, 'action': 'set_attr', 'name': 'rel', 'value': 'nofollow'},
+])
+events = transform(parse('input.xml'))
+```
+
+All rules are compiled into one generator, so that every event goes through
+a single generator frame regardless of the number of rules.
+"""
+from lxmlx.event import ENTER, EXIT, TEXT
+
+RENAME       = 'rename'
+DROP         = 'drop'
+UNWRAP       = 'unwrap'
+SET_ATTR     = 'set_attr'
+REPLACE_TEXT = 'replace_text'
+
+_ACTION_ARGS = {
+    RENAME      : ('to',),
+    DROP        : (),
+    UNWRAP      : (),
+    SET_ATTR    : ('name', 'value'),
+    REPLACE_TEXT: ('text',),
+}
+
+_MATCH_KEYS = ('tag', 'attrib', 'ancestors')
+
+
+class _Rule:
+
+    __slots__ = ('tags', 'attrib', 'ancestors', 'action', 'args')
+
+    def __init__(self, rule):
+        action = rule.get('action')
+        if action not in _ACTION_ARGS:
+            raise ValueError('unknown rule action: ' + repr(action))
+        args = _ACTION_ARGS[action]
+        for key in rule:
+            if key != 'action' and key not in _MATCH_KEYS and key not in args:
+                raise ValueError('unexpected key ' + repr(key) + ' in rule ' + repr(rule))
+        for key in args:
+            if key not in rule:
+                raise ValueError('rule ' + repr(rule) + ' is missing ' + repr(key))
+
+        tag = rule.get('tag')
+        if tag is None:
+            self.tags = None
+        elif isinstance(tag, str):
+            self.tags = frozenset([tag])
+        else:
+            self.tags = frozenset(tag)
+        self.attrib = sorted((rule.get('attrib') or {}).items())
+        self.ancestors = list(rule.get('ancestors') or ())
+        self.action = action
+        self.args = tuple(rule[key] for key in args)
+
+    @property
+    def conditional(self):
+        return bool(self.attrib or self.ancestors)
+
+    def matches(self, obj, path):
+        if self.attrib:
+            attrib = obj.get('attrib') or {}
+            for name, value in self.attrib:
+                if name not in attrib or (value is not None and attrib[name] != value):
+                    return False
+        if self.ancestors:
+            n = len(self.ancestors)
+            if len(path) < n:
+                return False
+            for x, y in zip(self.ancestors, path[-n:]):
+                if x != '*' and x != y:
+                    return False
+        return True
+
+
+def compile_rules(rules):
+    """compiles list of rules into a function that transforms event stream.
+
+    For each element, all matching rules are applied in order. Rules match
+    against the source document (tags and attributes before any renaming
+    or attribute rewriting). `drop` takes precedence over any other action,
+    `unwrap` takes precedence over `rename` and `set_attr`."""
+
+    compiled = [_Rule(rule) for rule in rules]
+    need_path = any(rule.ancestors for rule in compiled)
+
+    by_tag = {}  # tag -> [(rule, conditional)] applicable to this tag, in order
+
+    def rules_for(tag):
+        result = [(rule, rule.conditional) for rule in compiled
+            if rule.tags is None or tag in rule.tags]
+        by_tag[tag] = result
+        return result
+
+    def transform(events):
+        keep = []   # for every open element: whether to emit its EXIT
+        path = []   # source tags of open elements (only if needed by rules)
+        skip = 0    # depth inside dropped (or replaced) content
+
+        for obj in events:
+            t = obj['type']
+
+            if skip:
+                if t == ENTER:
+                    skip += 1
+                elif t == EXIT:
+                    skip -= 1
+                    if skip == 0:
+                        if need_path:
+                            path.pop()
+                        if keep.pop():
+                            yield obj
+                continue
+
+            if t == ENTER:
+                tag = obj['tag']
+                candidates = by_tag.get(tag)
+                if candidates is None:
+                    candidates = rules_for(tag)
+
+                if not candidates:
+                    if need_path:
+                        path.append(tag)
+                    keep.append(True)
+                    yield obj
+                    continue
+
+                out = obj
+                emit = True
+                drop = False
+                replace = None
+                for rule, conditional in candidates:
+                    if conditional and not rule.matches(obj, path):
+                        continue
+                    action = rule.action
+                    if action == DROP:
+                        drop = True
+                        break
+                    elif action == UNWRAP:
+                        emit = False
+                    elif action == RENAME:
+                        if out is obj:
+                            out = dict(obj)
+                        out['tag'] = rule.args[0]
+                    elif action == SET_ATTR:
+                        if out is obj:
+                            out = dict(obj)
+                        name, value = rule.args
+                        attrib = dict(out.get('attrib') or {})
+                        if value is None:
+                            attrib.pop(name, None)
+                        else:
+                            attrib[name] = value
+                        if attrib:
+                            out['attrib'] = attrib
+                        else:
+                            out.pop('attrib', None)
+                    elif action == REPLACE_TEXT:
+                        replace = rule.args[0]
+
+                if need_path:
+                    path.append(tag)
+
+                if drop:
+                    keep.append(False)
+                    skip = 1
+                    continue
+
+                keep.append(emit)
+                if emit:
+                    yield out
+                if replace is not None:
+                    if replace:
+                        yield {'type': TEXT, 'text': replace}
+                    skip = 1
+
+            elif t == EXIT:
+                if need_path:
+                    path.pop()
+                if keep.pop():
+                    yield obj
+
+            else:
+                yield obj
+
+    return transform
@@ -0,0 +1,188 @@
+"""
+Content-addressed hashing of event stream subtrees.
+
+Each element gets a Merkle-style digest computed from its tag, attributes,
+text and the digests of its children. Identical subtrees (for example,
+repeated boilerplate sections) therefore get identical digests, no matter
+where in the document they occur, and no matter how their text happens to be
+split into TEXT events.
+"""
+import hashlib
+import collections
+from lxmlx.event import ENTER, EXIT, TEXT, COMMENT, PI, with_peer
+
+# Hashed content is a sequence of records, each starting with NUL and a record
+# type byte. Variable-length fields end with NUL, which can not occur in
+# well-formed XML names, attribute values or text, so framing is unambiguous.
+# A run of adjacent TEXT events makes a single record, so that splitting text
+# into events does not change the digest.
+_ENTER   = b'\x00<'
+_ATTR    = b'\x00@'
+_CHILD   = b'\x00>'
+_TEXT    = b'\x00T'
+_COMMENT = b'\x00!'
+_PI      = b'\x00?'
+_END     = b'\x00'
+
+
+class _Frame:
+
+    __slots__ = ('hash', 'in_text')
+
+    def __init__(self, h):
+        self.hash = h
+        self.in_text = False
+
+    def update(self, data):
+        if self.in_text:
+            self.hash.update(_END)
+            self.in_text = False
+        self.hash.update(data)
+
+    def update_text(self, text):
+        if text:
+            if not self.in_text:
+                self.hash.update(_TEXT)
+                self.in_text = True
+            self.hash.update(text.encode('utf-8'))
+
+    def digest(self):
+        if self.in_text:
+            self.hash.update(_END)
+            self.in_text = False
+        return self.hash.digest()
+
+
+def with_hash(events, hashfunc=hashlib.sha1):
+    """locates ENTER peer for each EXIT object (like `with_peer`) and
+    computes the digest of the subtree it closes.
+
+    Yields triples (obj, peer, digest). For EXIT events `peer` is the matching
+    ENTER event, and `digest` is the subtree digest (bytes). For all other
+    events both are None."""
+
+    stack = []
+    for obj, peer in with_peer(events):
+        if obj['type'] == ENTER:
+            frame = _Frame(hashfunc(_ENTER + obj['tag'].encode('utf-8') + _END))
+            attrib = obj.get('attrib')
+            if attrib:
+                for name, value in sorted(attrib.items()):
+                    frame.update(_ATTR + name.encode('utf-8') + _END + value.encode('utf-8') + _END)
+            stack.append(frame)
+            yield obj, None, None
+        elif obj['type'] == EXIT:
+            digest = stack.pop().digest()
+            if stack:
+                stack[-1].update(_CHILD + digest)
+            yield obj, peer, digest
+        else:
+            if stack:
+                if obj['type'] == TEXT:
+                    stack[-1].update_text(obj['text'])
+                elif obj['type'] == COMMENT:
+                    stack[-1].update(_COMMENT + obj['text'].encode('utf-8') + _END)
+                elif obj['type'] == PI:
+                    stack[-1].update(_PI + obj['target'].encode('utf-8') + _END
+                        + (obj.get('text') or '').encode('utf-8') + _END)
+                else:
+                    assert False, obj
+            yield obj, None, None
+
+
+def subtree_digest(events, hashfunc=hashlib.sha1):
+    """computes digest of a single subtree (events must start with ENTER
+    and end with the matching EXIT)"""
+    digest = None
+    for _, _, digest in with_hash(events, hashfunc=hashfunc):
+        pass
+    if digest is None:
+        raise RuntimeError('Empty XML event stream')
+    return digest
+
+
+class LRUCache:
+    """Bounded cache with least-recently-used eviction and hit counters"""
+
+    def __init__(self, maxsize=1024):
+        if maxsize <= 0:
+            raise ValueError('maxsize must be positive')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def dedup_transform(events, select, transform, cache=None, hashfunc=hashlib.sha1):
+    """applies `transform` to every subtree whose ENTER event satisfies
+    `select(obj)`, reusing earlier results for identical subtrees.
+
+    `transform` receives the list of subtree events (from ENTER to the
+    matching EXIT) and returns an iterable of replacement events. Results
+    are stored in `cache` (an `LRUCache`) keyed by the subtree digest. Cached
+    events are yielded as-is for every repeated subtree, hence they must be
+    treated as read-only downstream.
+
+    Selected subtrees are buffered in memory, events outside of them are
+    streamed through."""
+
+    if cache is None:
+        cache = LRUCache()
+
+    events = iter(events)
+    for obj in events:
+        if obj['type'] != ENTER or not select(obj):
+            yield obj
+            continue
+
+        buffer = [obj]
+        depth = 1
+        for obj in events:
+            buffer.append(obj)
+            if obj['type'] == ENTER:
+                depth += 1
+            elif obj['type'] == EXIT:
+                depth -= 1
+                if depth == 0:
+                    break
+        else:
+            raise RuntimeError('Unbalanced XML event stream')
+
+        digest = subtree_digest(buffer, hashfunc=hashfunc)
+        result = cache.get(digest)
+        if result is None:
+            result = list(transform(buffer))
+            cache.put(digest, result)
+        for x in result: yield x
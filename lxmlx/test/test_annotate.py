@@ -0,0 +1,105 @@
+import unittest
+import io
+import lxml.etree as et
+from lxmlx.event import scan, text_of
+from lxmlx.annotate import annotate
+from lxmlx.xml_writer import XmlWriter
+
+
+def _annotate(text, spans):
+    events = list(scan(et.fromstring(text)))
+    result = list(annotate(events, spans))
+    assert text_of(result) == text_of(events)
+
+    out = io.BytesIO()
+    XmlWriter(out).write_events(result)
+    return out.getvalue()
+
+
+class TestAnnotate(unittest.TestCase):
+
+    def test_simple(self):
+        self.assertEqual(
+            _annotate(b'<a>Hello, world!</a>', [(0, 5, 'x'), (7, 12, 'y', {'k': 'v'})]),
+            b'<a><x>Hello</x>, <y k="v">world</y>!</a>'
+        )
+
+    def test_no_spans(self):
+        self.assertEqual(_annotate(b'<a>Hello <b>world</b></a>', []), b'<a>Hello <b>world</b></a>')
+
+    def test_split_text_events(self):
+        events = [
+            dict(type='enter', tag='a'),
+            dict(type='text',  text='Hel'),
+            dict(type='text',  text='lo'),
+            dict(type='exit'),
+        ]
+        self.assertEqual(list(annotate(events, [(1, 4, 'x')])), [
+            dict(type='enter', tag='a'),
+            dict(type='text',  text='H'),
+            dict(type='enter', tag='x'),
+            dict(type='text',  text='el'),
+            dict(type='text',  text='l'),
+            dict(type='exit'),
+            dict(type='text',  text='o'),
+            dict(type='exit'),
+        ])
+
+    def test_tight_at_element_boundaries(self):
+        self.assertEqual(
+            _annotate(b'<a>Hello <b>world</b>!</a>', [(6, 11, 'x')]),
+            b'<a>Hello <b><x>world</x></b>!</a>'
+        )
+
+    def test_crossing_elements(self):
+        self.assertEqual(
+            _annotate(b'<a>Hello <b>world</b>!</a>', [(3, 12, 'x')]),
+            b'<a>Hel<x>lo </x><b><x>world</x></b><x>!</x></a>'
+        )
+
+    def test_nested_spans(self):
+        self.assertEqual(
+            _annotate(b'<a>Hello, world!</a>', [(0, 12, 'x'), (0, 5, 'y'), (7, 12, 'z')]),
+            b'<a><x><y>Hello</y>, <z>world</z></x>!</a>'
+        )
+
+    def test_overlapping_spans(self):
+        self.assertEqual(
+            _annotate(b'<a>abcdef</a>', [(0, 4, 'x'), (2, 6, 'y')]),
+            b'<a><x>ab<y>cd</y></x><y>ef</y></a>'
+        )
+
+    def test_empty_spans(self):
+        self.assertEqual(
+            _annotate(b'<a>abc<b/>def</a>', [(0, 0, 'x'), (3, 3, 'y'), (6, 6, 'z')]),
+            b'<a><x/>abc<y/><b/>def<z/></a>'
+        )
+        self.assertEqual(_annotate(b'<a/>', [(0, 0, 'x')]), b'<a><x/></a>')
+        self.assertEqual(
+            _annotate(b'<a><b/><!--c--></a>', [(0, 0, 'x'), (0, 0, 'y')]),
+            b'<a><x/><y/><b/><!--c--></a>'
+        )
+        self.assertEqual(
+            _annotate(b'<a><b/>cd</a>', [(0, 0, 'x'), (2, 2, 'y')]),
+            b'<a><x/><b/>cd<y/></a>'
+        )
+
+    def test_comments_and_pi(self):
+        self.assertEqual(
+            _annotate(b'<a>ab<!--c--><?p q?>cd</a>', [(1, 3, 'x')]),
+            b'<a>a<x>b<!--c--><?p q?>c</x>d</a>'
+        )
+
+    def test_errors(self):
+        with self.assertRaisesRegex(RuntimeError, 'out of the document text'):
+            _annotate(b'<a>abc</a>', [(1, 4, 'x')])
+
+        with self.assertRaisesRegex(ValueError, 'not sorted'):
+            _annotate(b'<a>abc</a>', [(2, 3, 'x'), (1, 2, 'y')])
+
+        with self.assertRaisesRegex(ValueError, 'before its start'):
+            _annotate(b'<a>abc</a>', [(2, 1, 'x')])
+
+
+if __name__ == '__main__':
+    unittest.main()
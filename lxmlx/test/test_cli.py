@@ -0,0 +1,138 @@
+import unittest
+import contextlib
+import gzip
+import io
+import os
+import tempfile
+from lxmlx.cli import main
+
+
+XML = b'<doc><r id="1">a<b>x</b></r>t<r id="2">b<script>s</script></r></doc>'
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.input = self.path('input.xml')
+        with open(self.input, 'wb') as f:
+            f.write(XML)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp, name)
+
+    def run_cli(self, *argv):
+        output = self.path('output')
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            code = main(list(argv) + ['-o', output])
+        self.assertEqual(code, 0, stderr.getvalue())
+        with open(output, 'rb') as f:
+            return f.read()
+
+    def test_cat(self):
+        self.assertEqual(self.run_cli('cat', self.input), XML)
+
+    def test_extract(self):
+        self.assertEqual(
+            self.run_cli('extract', '--tag', 'b', '--tag', 'script', self.input),
+            b'<doc><b>x</b><script>s</script></doc>'
+        )
+        self.assertEqual(
+            self.run_cli('extract', '--tag', 'r', '--wrap', 'records', self.input),
+            b'<records><r id="1">a<b>x</b></r><r id="2">b<script>s</script></r></records>'
+        )
+        self.assertEqual(self.run_cli('extract', '--tag', 'doc', self.input), XML)
+        self.assertEqual(
+            self.run_cli('extract', '--tag', 'doc', '--wrap', 'docs', self.input),
+            b'<docs>' + XML + b'</docs>'
+        )
+
+    def test_strip(self):
+        self.assertEqual(
+            self.run_cli('strip', '--tag', 'r', '--drop', 'script', self.input),
+            b'<doc>a<b>x</b>tb</doc>'
+        )
+
+    def test_text(self):
+        self.assertEqual(self.run_cli('text', self.input), b'axtbs')
+
+    def test_jsonl_roundtrip(self):
+        jsonl = self.path('events.jsonl')
+        with open(jsonl, 'wb') as f:
+            f.write(self.run_cli('to-jsonl', self.input))
+        self.assertEqual(self.run_cli('from-jsonl', jsonl), XML)
+
+    def test_compressed(self):
+        compressed = self.path('input.xml.gz')
+        with open(compressed, 'wb') as f:
+            f.write(gzip.compress(XML))
+        self.assertEqual(self.run_cli('cat', compressed), XML)
+
+        output = self.path('output.xml.gz')
+        self.assertEqual(main(['cat', self.input, '-o', output]), 0)
+        with open(output, 'rb') as f:
+            self.assertEqual(gzip.decompress(f.read()), XML)
+
+    def test_jobs(self):
+        inputs = []
+        for i in range(4):
+            inputs.append(self.path('input%d.xml' % i))
+            with open(inputs[-1], 'wb') as f:
+                f.write(b'<doc>text %d</doc>' % i)
+
+        self.assertEqual(self.run_cli('text', *inputs), b'text 0text 1text 2text 3')
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            with self.assertRaises(SystemExit):
+                main(['text', '--jobs', '2', '-o', self.path('output')] + inputs)
+        self.assertIn('--jobs requires --output-dir', stderr.getvalue())
+
+        outdir = self.path('out')
+        self.assertEqual(main(['text', '--jobs', '2', '--output-dir', outdir] + inputs), 0)
+        for i in range(4):
+            with open(os.path.join(outdir, 'input%d.txt' % i), 'rb') as f:
+                self.assertEqual(f.read(), b'text %d' % i)
+
+    def test_stats(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            main(['cat', '--stats', self.input, '-o', self.path('output')])
+        self.assertIn('events:      15', stderr.getvalue())
+        self.assertIn('files:       1', stderr.getvalue())
+
+    def test_error(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            code = main(['cat', self.path('missing.xml'), '-o', self.path('output')])
+        self.assertEqual(code, 1)
+        self.assertIn('lxmlx: error:', stderr.getvalue())
+
+    def test_several_xml_outputs(self):
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            with self.assertRaises(SystemExit):
+                main(['cat', self.input, self.input, '-o', self.path('output')])
+        self.assertIn('requires --output-dir', stderr.getvalue())
+
+        outdir = self.path('out')
+        self.assertEqual(main(['cat', self.input, self.input, '--output-dir', outdir]), 0)
+        with open(os.path.join(outdir, 'input.xml'), 'rb') as f:
+            self.assertEqual(f.read(), XML)
+
+    def test_syntax_error(self):
+        bad = self.path('bad.xml')
+        with open(bad, 'wb') as f:
+            f.write(b'<doc><r></doc>')
+        for jobs in ('1', '2'):
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                code = main(['cat', '--jobs', jobs, bad, self.input, '--output-dir', self.path('out')])
+            self.assertEqual(code, 1)
+            self.assertIn('lxmlx: error:', stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import io
+import os
+import gzip
+import bz2
+import lzma
+import tempfile
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+from lxmlx.event import parse
+from lxmlx.xml_writer import XmlWriter
+from lxmlx.threaded_io import PrefetchReader
+from lxmlx.compression import compression_from_filename, \
+    compression_from_header, CompressingWriter
+
+
+XML = b'<doc>' + b''.join(b'<p n="%d">paragraph %d</p>' % (i, i) for i in range(1000)) + b'</doc>'
+
+_DECOMPRESS = {
+    'gzip': gzip.decompress,
+    'bz2' : bz2.decompress,
+    'xz'  : lzma.decompress,
+}
+
+
+class TestCompression(unittest.TestCase):
+
+    def test_detect(self):
+        self.assertEqual(compression_from_filename('a.xml.gz'), 'gzip')
+        self.assertEqual(compression_from_filename('a.xml.BZ2'), 'bz2')
+        self.assertEqual(compression_from_filename('a.xml.xz'), 'xz')
+        self.assertEqual(compression_from_filename('a.xml.zst'), 'zstd')
+        self.assertIsNone(compression_from_filename('a.xml'))
+        self.assertEqual(compression_from_filename(b'a.xml.gz'), 'gzip')
+
+        self.assertEqual(compression_from_header(gzip.compress(XML)), 'gzip')
+        self.assertEqual(compression_from_header(bz2.compress(XML)), 'bz2')
+        self.assertEqual(compression_from_header(lzma.compress(XML)), 'xz')
+        self.assertIsNone(compression_from_header(XML))
+
+    def test_parse(self):
+        model = list(parse(io.BytesIO(XML)))
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'test.xml')
+            with open(filename, 'wb') as f:
+                f.write(XML)
+            self.assertEqual(list(parse(os.fsencode(filename))), model)
+
+            for compression, compress in [('gzip', gzip.compress), ('bz2', bz2.compress), ('xz', lzma.compress)]:
+                # extension does not matter, magic bytes do
+                filename = os.path.join(tmp, 'test-' + compression + '.xml')
+                with open(filename, 'wb') as f:
+                    f.write(compress(XML))
+
+                self.assertEqual(list(parse(filename)), model)
+                self.assertEqual(list(parse(os.fsencode(filename))), model)
+                with open(filename, 'rb') as f:
+                    self.assertEqual(list(parse(f)), model)
+
+                # file objects without `peek`
+                self.assertEqual(list(parse(io.BytesIO(compress(XML)))), model)
+                with PrefetchReader(io.BytesIO(compress(XML)), chunk_size=3) as f:
+                    self.assertEqual(list(parse(f)), model)
+
+    def test_write(self):
+        for compression, decompress in _DECOMPRESS.items():
+            out = io.BytesIO()
+            with XmlWriter(out, compression=compression, compresslevel=1) as writer:
+                writer.write_events(parse(io.BytesIO(XML)))
+            self.assertEqual(decompress(out.getvalue()), XML)
+
+    @unittest.skipIf(zstandard is None, 'zstandard is not installed')
+    def test_zstd(self):
+        out = io.BytesIO()
+        with XmlWriter(out, compression='zstd', compression_threads=2) as writer:
+            writer.write_events(parse(io.BytesIO(XML)))
+        self.assertEqual(compression_from_header(out.getvalue()), 'zstd')
+
+        out.seek(0)
+        self.assertEqual(list(parse(io.BufferedReader(out))), list(parse(io.BytesIO(XML))))
+
+    def test_write_chunks(self):
+        out = io.BytesIO()
+        writer = CompressingWriter(out, 'gzip', chunk_size=100)
+        for i in range(0, len(XML), 7):
+            writer.write(XML[i:i+7])
+        writer.close()
+        self.assertEqual(gzip.decompress(out.getvalue()), XML)
+
+    def test_errors(self):
+        with self.assertRaisesRegex(ValueError, 'unknown compression'):
+            XmlWriter(io.BytesIO(), compression='rar')
+
+        with self.assertRaisesRegex(ValueError, 'only supported by zstd'):
+            XmlWriter(io.BytesIO(), compression='gzip', compression_threads=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
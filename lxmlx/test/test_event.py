@@ -1,6 +1,7 @@
 import unittest
+import io
 import lxml.etree as et
-from lxmlx.event import scan, unscan, with_peer, text_of
+from lxmlx.event import scan, unscan, parse, with_peer, text_of
 
 
 class TestEventsJson(unittest.TestCase):
@@ -106,6 +107,21 @@ class TestEventsJson(unittest.TestCase):
         _roundtrip(b'<root><?pi1 pi text?></root>')
         _roundtrip(b'<root>Hello<?pi1 pi text?>world</root>')
 
+    def test_parse_pi(self):
+        text = b'<a><?pi1 pi text?><b>x</b><?pi2?></a>'
+        events = list(parse(io.BytesIO(text)))
+
+        self.assertEqual(events, [
+            dict(type='enter', tag='a'),
+            dict(type='pi',    target='pi1', text='pi text'),
+            dict(type='enter', tag='b'),
+            dict(type='text',  text='x'),
+            dict(type='exit'),
+            dict(type='pi',    target='pi2'),
+            dict(type='exit'),
+        ])
+        self.assertEqual(events, list(scan(et.fromstring(text))))
+
     def test_text_of(self):
         xml = et.fromstring(b'<a>Hello! <b>World</b>!</a>')
         text = text_of(scan(xml))
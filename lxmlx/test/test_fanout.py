@@ -0,0 +1,104 @@
+import unittest
+import io
+import lxml.etree as et
+from lxmlx.event import scan, TEXT
+from lxmlx.xml_writer import XmlWriter
+from lxmlx.fanout import fan_out, TeeTarget, CountingTarget, RoutingWriter
+
+
+class _File(io.BytesIO):
+
+    def close(self):
+        self.data = self.getvalue()
+        io.BytesIO.close(self)
+
+
+class _Opener:
+
+    def __init__(self):
+        self.files = []
+
+    def __call__(self, key, part):
+        f = _File()
+        self.files.append((key, part, f))
+        return f
+
+    def data(self):
+        return [(key, part, f.data) for key, part, f in self.files]
+
+
+XML = b'<doc><rec t="a">1</rec><rec t="b">2</rec>x<rec t="a">3</rec><rec t="b">4</rec></doc>'
+
+
+class TestFanOut(unittest.TestCase):
+
+    def test_fan_out(self):
+        out = io.BytesIO()
+        writer = XmlWriter(out)
+        text = []
+
+        fan_out(scan(et.fromstring(b'<a>Hello <b>world</b></a>')),
+            writer.write_event,
+            lambda obj: text.append(obj['text']) if obj['type'] == TEXT else None
+        )
+
+        self.assertEqual(out.getvalue(), b'<a>Hello <b>world</b></a>')
+        self.assertEqual(''.join(text), 'Hello world')
+
+    def test_tee_target(self):
+        out1 = io.BytesIO()
+        out2 = io.BytesIO()
+        XmlWriter(TeeTarget(out1, out2)).write_events(scan(et.fromstring(b'<a>Hello</a>')))
+        self.assertEqual(out1.getvalue(), b'<a>Hello</a>')
+        self.assertEqual(out2.getvalue(), b'<a>Hello</a>')
+
+    def test_counting_target(self):
+        out = io.BytesIO()
+        target = CountingTarget(out)
+        XmlWriter(target).write_events(scan(et.fromstring(b'<a>Hello</a>')))
+        self.assertEqual(out.getvalue(), b'<a>Hello</a>')
+        self.assertEqual(target.count, 12)
+
+    def test_routing(self):
+        opener = _Opener()
+        with RoutingWriter(opener, lambda obj: obj['attrib']['t']) as writer:
+            writer.write_events(scan(et.fromstring(XML)))
+
+        self.assertEqual(sorted(opener.data()), [
+            ('a', 0, b'<doc><rec t="a">1</rec><rec t="a">3</rec></doc>'),
+            ('b', 0, b'<doc><rec t="b">2</rec><rec t="b">4</rec></doc>'),
+        ])
+
+    def test_routing_nested(self):
+        opener = _Opener()
+        route = lambda obj: 'all' if obj['tag'] == 'rec' else None
+        with RoutingWriter(opener, route, wrap=False) as writer:
+            writer.write_events(scan(et.fromstring(b'<doc><group><rec/>x</group><rec>y</rec></doc>')))
+
+        self.assertEqual(opener.data(), [('all', 0, b'<rec/><rec>y</rec>')])
+
+    def test_routing_max_open(self):
+        opener = _Opener()
+        with RoutingWriter(opener, lambda obj: obj['attrib']['t'], max_open=1) as writer:
+            writer.write_events(scan(et.fromstring(XML)))
+
+        self.assertEqual(opener.data(), [
+            ('a', 0, b'<doc><rec t="a">1</rec></doc>'),
+            ('b', 0, b'<doc><rec t="b">2</rec></doc>'),
+            ('a', 1, b'<doc><rec t="a">3</rec></doc>'),
+            ('b', 1, b'<doc><rec t="b">4</rec></doc>'),
+        ])
+
+    def test_routing_max_bytes(self):
+        opener = _Opener()
+        with RoutingWriter(opener, lambda obj: 'all', max_bytes=40) as writer:
+            writer.write_events(scan(et.fromstring(XML)))
+
+        self.assertEqual(opener.data(), [
+            ('all', 0, b'<doc><rec t="a">1</rec><rec t="b">2</rec></doc>'),
+            ('all', 1, b'<doc><rec t="a">3</rec><rec t="b">4</rec></doc>'),
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
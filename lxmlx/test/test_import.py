@@ -0,0 +1,45 @@
+import unittest
+import subprocess
+import sys
+import os
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _run(code):
+    """runs `code` in a fresh interpreter, returns its output"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = _ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    return subprocess.check_output([sys.executable, '-c', code], env=env).decode()
+
+
+def _loaded_modules(code):
+    """runs `code` in a fresh interpreter, returns set of loaded modules"""
+    return set(_run(code + '\nimport sys\nprint("\\n".join(sys.modules))').split())
+
+
+class TestImport(unittest.TestCase):
+
+    def test_package_is_light(self):
+        modules = _loaded_modules('import lxmlx')
+        self.assertEqual({m for m in modules if m.startswith('lxmlx.')}, set())
+        self.assertNotIn('lxml', modules)
+
+    def test_writer_does_not_load_lxml(self):
+        modules = _loaded_modules('import lxmlx.xml_writer')
+        self.assertNotIn('lxml', modules)
+        self.assertNotIn('lxml.etree', modules)
+
+    def test_validate_compiles_on_first_use(self):
+        out = _run(
+            'import lxmlx.validate as v\n'
+            'classes = getattr(v, "__CHAR_CLASSES")\n'
+            'print(len(classes))\n'
+            'v.validate_xml_name("a")\n'
+            'print(len(classes))'
+        )
+        self.assertEqual(out.split(), ['0', '2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import gzip
+import io
+import json
+from lxmlx.event import parse
+from lxmlx.xml_writer import XmlWriter
+from lxmlx.jsonl import write_jsonl, read_jsonl
+
+
+XML = b'<doc a="1"><!--note--><p>Hello, <b>w\xc3\xb6rld</b>!\n</p><?pi text?><?empty?></doc>'
+
+EVENTS = [
+    dict(type='enter', tag='doc', attrib={'a': '1'}),
+    dict(type='comment', text='note'),
+    dict(type='enter', tag='p'),
+    dict(type='text', text='Hello, '),
+    dict(type='enter', tag='b'),
+    dict(type='text', text='wörld'),
+    dict(type='exit'),
+    dict(type='text', text='!\n'),
+    dict(type='exit'),
+    dict(type='pi', target='pi', text='text'),
+    dict(type='pi', target='empty'),
+    dict(type='exit'),
+]
+
+
+def _encode(events, **kw):
+    out = io.BytesIO()
+    write_jsonl(events, out, **kw)
+    return out.getvalue()
+
+
+class TestJsonl(unittest.TestCase):
+
+    def test_write(self):
+        data = _encode(EVENTS[:3], batch_size=2)
+        self.assertEqual(data.decode('utf-8').splitlines(), [
+            '{"type":"enter","tag":"doc","attrib":{"a":"1"}}',
+            '{"type":"comment","text":"note"}',
+            '{"type":"enter","tag":"p"}',
+        ])
+        for line in _encode(EVENTS).splitlines():
+            json.loads(line.decode('utf-8'))
+
+    def test_write_compact(self):
+        data = _encode(EVENTS, compact=True)
+        self.assertEqual(data.decode('utf-8').splitlines(), [
+            '["e","doc",{"a":"1"}]',
+            '["c","note"]',
+            '["e","p"]',
+            '["t","Hello, "]',
+            '["e","b"]',
+            '["t","wörld"]',
+            '["x"]',
+            '["t","!\\n"]',
+            '["x"]',
+            '["p","pi","text"]',
+            '["p","empty"]',
+            '["x"]',
+        ])
+
+    def test_roundtrip(self):
+        for compact in (False, True):
+            for batch_size in (1, 5, 1000):
+                data = _encode(EVENTS, compact=compact, batch_size=batch_size)
+                self.assertEqual(list(read_jsonl(io.BytesIO(data), batch_size=batch_size)), EVENTS)
+
+    def test_read_mixed_and_blank_lines(self):
+        data = b'\n["e","a"]\n\n{"type":"text","text":"x"}\n   \n["x"]\n\n'
+        self.assertEqual(list(read_jsonl(io.BytesIO(data), batch_size=2)), [
+            dict(type='enter', tag='a'),
+            dict(type='text', text='x'),
+            dict(type='exit'),
+        ])
+
+    def test_intern(self):
+        data = _encode([dict(type='enter', tag='tag' + 'name', attrib={'attr' + 'name': 'v'}), dict(type='exit')])
+        obj = next(read_jsonl(io.BytesIO(data)))
+        self.assertIs(obj['tag'], 'tagname')
+        self.assertIs(next(iter(obj['attrib'])), 'attrname')
+
+    def test_xml_roundtrip(self):
+        data = _encode(parse(io.BytesIO(XML)))
+        out = io.BytesIO()
+        XmlWriter(out).write_events(read_jsonl(io.BytesIO(data)))
+        self.assertEqual(out.getvalue(), XML)
+
+    def test_compressed(self):
+        data = gzip.compress(_encode(EVENTS, compact=True))
+        self.assertEqual(list(read_jsonl(io.BufferedReader(io.BytesIO(data)))), EVENTS)
+        self.assertEqual(list(read_jsonl(io.BytesIO(data))), EVENTS)
+
+    def test_invalid_json(self):
+        with self.assertRaisesRegex(ValueError, 'invalid JSON on line 2:'):
+            list(read_jsonl(io.BytesIO(b'["e","a"]\n["e","b"],["x"]\n["x"]\n["x"]\n')))
+        with self.assertRaisesRegex(ValueError, 'invalid JSON on line 5:'):
+            list(read_jsonl(io.BytesIO(b'["e","a"]\n\n["t","x"]\n["x"]\n["t",\n'), batch_size=2))
+        with self.assertRaisesRegex(ValueError, 'invalid JSON on line 1:'):
+            list(read_jsonl(io.BytesIO(b'["e","a"],["x"\n"y"]\n')))
+
+    def test_bad_compact_event(self):
+        with self.assertRaisesRegex(RuntimeError, 'unknown compact event type'):
+            list(read_jsonl(io.BytesIO(b'["z"]\n')))
+
+
+if __name__ == '__main__':
+    unittest.main()
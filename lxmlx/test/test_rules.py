@@ -0,0 +1,106 @@
+import unittest
+import io
+import lxml.etree as et
+from lxmlx.event import scan
+from lxmlx.xml_writer import XmlWriter
+from lxmlx.rules import compile_rules
+
+
+def _transform(rules, text):
+    out = io.BytesIO()
+    XmlWriter(out).write_events(compile_rules(rules)(scan(et.fromstring(text))))
+    return out.getvalue()
+
+
+class TestRules(unittest.TestCase):
+
+    def test_no_rules(self):
+        self.assertEqual(_transform([], b'<a>Hello <b>world</b>!</a>'), b'<a>Hello <b>world</b>!</a>')
+
+    def test_rename(self):
+        self.assertEqual(
+            _transform([{'tag': 'b', 'action': 'rename', 'to': 'strong'}], b'<a>Hello <b x="1">world</b>!</a>'),
+            b'<a>Hello <strong x="1">world</strong>!</a>'
+        )
+
+    def test_drop(self):
+        self.assertEqual(
+            _transform([{'tag': ['b', 'c'], 'action': 'drop'}], b'<a>Hello <b>wo<b>r</b>ld</b>!<c/></a>'),
+            b'<a>Hello !</a>'
+        )
+
+    def test_unwrap(self):
+        self.assertEqual(
+            _transform([{'tag': 'b', 'action': 'unwrap'}], b'<a>Hello <b>wo<i>r</i>ld</b>!</a>'),
+            b'<a>Hello wo<i>r</i>ld!</a>'
+        )
+
+    def test_set_attr(self):
+        rules = [
+            {'tag': 'b', 'action': 'set_attr', 'name': 'y', 'value': '2'},
+            {'tag': 'b', 'action': 'set_attr', 'name': 'x', 'value': None},
+        ]
+        self.assertEqual(
+            _transform(rules, b'<a><b x="1"/><b x="1" z="3"/></a>'),
+            b'<a><b y="2"/><b y="2" z="3"/></a>'
+        )
+
+    def test_replace_text(self):
+        self.assertEqual(
+            _transform([{'tag': 'b', 'action': 'replace_text', 'text': 'XXX'}], b'<a>Hello <b>wo<i>r</i>ld</b>!</a>'),
+            b'<a>Hello <b>XXX</b>!</a>'
+        )
+        self.assertEqual(
+            _transform([{'tag': 'b', 'action': 'replace_text', 'text': ''}], b'<a>Hello <b>world</b>!</a>'),
+            b'<a>Hello <b/>!</a>'
+        )
+
+    def test_match_attrib(self):
+        rules = [
+            {'tag': 'p', 'attrib': {'class': 'note'}, 'action': 'drop'},
+            {'attrib': {'id': None}, 'action': 'rename', 'to': 'x'},
+        ]
+        self.assertEqual(
+            _transform(rules, b'<a><p class="note">1</p><p class="body">2</p><q id="3">3</q></a>'),
+            b'<a><p class="body">2</p><x id="3">3</x></a>'
+        )
+
+    def test_match_ancestors(self):
+        rules = [
+            {'tag': 'title', 'ancestors': ['book', '*'], 'action': 'rename', 'to': 'h1'},
+            {'tag': 'b', 'ancestors': ['title'], 'action': 'unwrap'},
+        ]
+        self.assertEqual(
+            _transform(rules, b'<book><title>T</title><ch><title>C<b>1</b></title></ch><b>2</b></book>'),
+            b'<book><title>T</title><ch><h1>C1</h1></ch><b>2</b></book>'
+        )
+
+    def test_rules_match_source(self):
+        rules = [
+            {'tag': 'b', 'action': 'rename', 'to': 'i'},
+            {'tag': 'i', 'action': 'rename', 'to': 'b'},
+        ]
+        self.assertEqual(_transform(rules, b'<a><b/><i/></a>'), b'<a><i/><b/></a>')
+
+    def test_precedence(self):
+        rules = [
+            {'tag': 'b', 'action': 'rename', 'to': 'i'},
+            {'tag': 'b', 'action': 'unwrap'},
+            {'tag': 'c', 'action': 'unwrap'},
+            {'tag': 'c', 'action': 'drop'},
+        ]
+        self.assertEqual(_transform(rules, b'<a><b>1</b><c>2</c></a>'), b'<a>1</a>')
+
+    def test_invalid_rules(self):
+        with self.assertRaisesRegex(ValueError, 'unknown rule action'):
+            compile_rules([{'tag': 'b', 'action': 'explode'}])
+
+        with self.assertRaisesRegex(ValueError, 'missing'):
+            compile_rules([{'tag': 'b', 'action': 'rename'}])
+
+        with self.assertRaisesRegex(ValueError, 'unexpected key'):
+            compile_rules([{'tags': 'b', 'action': 'drop'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import lxml.etree as et
+from lxmlx.event import scan, EXIT
+from lxmlx.subtree_hash import with_hash, subtree_digest, LRUCache, \
+    dedup_transform
+
+
+def _digest(text):
+    return subtree_digest(scan(et.fromstring(text)))
+
+
+class TestSubtreeHash(unittest.TestCase):
+
+    def test_with_hash(self):
+        xml = et.fromstring(b'<a>Hello <b>World</b><b>World</b></a>')
+        result = list(with_hash(scan(xml)))
+
+        self.assertEqual([obj for obj, _, _ in result], list(scan(xml)))
+        exits = [(peer['tag'], digest) for obj, peer, digest in result if obj['type'] == EXIT]
+        self.assertEqual([tag for tag, _ in exits], ['b', 'b', 'a'])
+        self.assertEqual(exits[0][1], exits[1][1])
+        self.assertNotEqual(exits[0][1], exits[2][1])
+
+        for obj, peer, digest in result:
+            if obj['type'] != EXIT:
+                self.assertIsNone(peer)
+                self.assertIsNone(digest)
+
+    def test_digest(self):
+        self.assertEqual(_digest(b'<a x="1" y="2">t</a>'), _digest(b'<a y="2" x="1">t</a>'))
+        self.assertNotEqual(_digest(b'<a x="1">t</a>'), _digest(b'<a x="2">t</a>'))
+        self.assertNotEqual(_digest(b'<a>t</a>'), _digest(b'<b>t</b>'))
+        self.assertNotEqual(_digest(b'<a><b/>t</a>'), _digest(b'<a>t<b/></a>'))
+        self.assertNotEqual(_digest(b'<a><b>t</b></a>'), _digest(b'<a><b/>t</a>'))
+        self.assertNotEqual(_digest(b'<a><!--t--></a>'), _digest(b'<a>t</a>'))
+
+    def test_digest_collisions(self):
+        self.assertNotEqual(_digest(b'<a>bt</a>'), _digest(b'<ab>t</ab>'))
+        self.assertNotEqual(_digest(b'<a x="1">t</a>'), _digest(b'<a x="1t"/>'))
+        self.assertNotEqual(_digest(b'<a x="1"/>'), _digest(b'<a x1=""/>'))
+        self.assertNotEqual(_digest(b'<a><!--a-->b</a>'), _digest(b'<a><!--ab--></a>'))
+        self.assertNotEqual(_digest(b'<a><?p a?>b</a>'), _digest(b'<a><?p ab?></a>'))
+        self.assertNotEqual(_digest(b'<a><?p?>b</a>'), _digest(b'<a><?pb?></a>'))
+        self.assertNotEqual(_digest(b'<a>t<b/>u</a>'), _digest(b'<a>tu<b/></a>'))
+
+    def test_digest_split_text(self):
+        events1 = [
+            dict(type='enter', tag='a'),
+            dict(type='text',  text='Hello, world'),
+            dict(type='exit'),
+        ]
+        events2 = [
+            dict(type='enter', tag='a'),
+            dict(type='text',  text='Hello, '),
+            dict(type='text',  text='world'),
+            dict(type='exit'),
+        ]
+        self.assertEqual(subtree_digest(events1), subtree_digest(events2))
+
+        events3 = events2[:2] + [dict(type='text', text='')] + events2[2:]
+        self.assertEqual(subtree_digest(events1), subtree_digest(events3))
+
+    def test_lru_cache(self):
+        cache = LRUCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)  # evicts 'b'
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 1)
+        self.assertAlmostEqual(cache.hit_rate, 2 / 3)
+
+    def test_dedup_transform(self):
+        xml = et.fromstring(b'<doc><note>Legal</note>x<note>Legal</note><note>Other</note></doc>')
+        calls = []
+
+        def upper(events):
+            calls.append(events)
+            for obj in events:
+                if obj['type'] == 'text':
+                    obj = dict(obj, text=obj['text'].upper())
+                yield obj
+
+        cache = LRUCache()
+        result = list(dedup_transform(scan(xml), lambda obj: obj['tag'] == 'note', upper, cache=cache))
+
+        self.assertEqual(result, [
+            dict(type='enter', tag='doc'),
+            dict(type='enter', tag='note'),
+            dict(type='text',  text='LEGAL'),
+            dict(type='exit'),
+            dict(type='text',  text='x'),
+            dict(type='enter', tag='note'),
+            dict(type='text',  text='LEGAL'),
+            dict(type='exit'),
+            dict(type='enter', tag='note'),
+            dict(type='text',  text='OTHER'),
+            dict(type='exit'),
+            dict(type='exit'),
+        ])
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import lxml.etree as et
+from lxmlx.event import scan, merge_text, text_of
+from lxmlx.text_index import index_text
+
+
+class TestTextIndex(unittest.TestCase):
+
+    def test_index(self):
+        xml = et.fromstring(b'<a>Hello! <b>Wor<c/>ld</b>!<d>?</d></a>')
+        index = index_text(scan(xml))
+
+        self.assertEqual(index.text, 'Hello! World!?')
+        self.assertEqual(len(index), 4)
+        self.assertEqual([index.element(i)['tag'] for i in range(4)], ['a', 'b', 'c', 'd'])
+        self.assertEqual([index.span(i) for i in range(4)], [(0, 14), (7, 12), (10, 10), (13, 14)])
+        self.assertEqual([index.parent(i) for i in range(4)], [None, 0, 1, 0])
+        self.assertEqual(index.text_of(1), 'World')
+        self.assertEqual(index.text_of(1), text_of(scan(xml[0])))
+
+    def test_innermost(self):
+        xml = et.fromstring(b'<a>Hello! <b>Wor<c/>ld</b>!<d>?</d></a>')
+        index = index_text(scan(xml))
+
+        model = [0] * 7 + [1] * 5 + [0] + [3]
+        self.assertEqual([index.innermost(i) for i in range(len(index.text))], model)
+
+        with self.assertRaises(IndexError):
+            index.innermost(len(index.text))
+
+    def test_outside_elements(self):
+        events = [
+            dict(type='text',  text='ab'),
+            dict(type='enter', tag='x'),
+            dict(type='text',  text='cd'),
+            dict(type='exit'),
+            dict(type='text',  text='ef'),
+        ]
+        index = index_text(events)
+        self.assertEqual([index.innermost(i) for i in range(6)], [None, None, 0, 0, None, None])
+
+    def test_merge_text(self):
+        events = [
+            dict(type='enter', tag='a'),
+            dict(type='text',  text='Hello'),
+            dict(type='text',  text=', '),
+            dict(type='enter', tag='b'),
+            dict(type='text',  text='world'),
+            dict(type='exit'),
+            dict(type='exit'),
+        ]
+        index1 = index_text(events)
+        index2 = index_text(merge_text(events))
+        self.assertEqual(index1.text, index2.text)
+        self.assertEqual([index1.span(i) for i in range(2)], [index2.span(i) for i in range(2)])
+
+    def test_unbalanced(self):
+        with self.assertRaisesRegex(RuntimeError, 'Unbalanced'):
+            index_text([dict(type='enter', tag='a')])
+
+        with self.assertRaisesRegex(RuntimeError, 'Unbalanced'):
+            index_text([dict(type='enter', tag='a'), dict(type='exit'), dict(type='exit')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+import io
+import os
+import tempfile
+from lxmlx.event import parse
+from lxmlx.xml_writer import XmlWriter
+from lxmlx.threaded_io import PrefetchReader, WriteBehind
+
+
+XML = b'<doc>' + b''.join(b'<p n="%d">paragraph %d</p>' % (i, i) for i in range(1000)) + b'</doc>'
+
+
+class _FailingTarget:
+
+    def write(self, data):
+        raise IOError('disk full')
+
+
+class _FlakyTarget:
+
+    def __init__(self):
+        self.data = []
+
+    def write(self, data):
+        if data == b'B':
+            raise IOError('transient failure')
+        self.data.append(data)
+
+
+class _FailingSource:
+
+    def __init__(self):
+        self._chunks = [b'<doc>']
+
+    def read(self, size):
+        if self._chunks:
+            return self._chunks.pop()
+        raise IOError('connection reset')
+
+
+class TestThreadedIO(unittest.TestCase):
+
+    def test_prefetch_read(self):
+        with PrefetchReader(io.BytesIO(XML), chunk_size=100, queue_depth=2) as f:
+            self.assertEqual(f.read(5), b'<doc>')
+            self.assertEqual(f.read(200), XML[5:205])
+            self.assertEqual(f.read(), XML[205:])
+            self.assertEqual(f.read(10), b'')
+
+    def test_prefetch_parse(self):
+        with PrefetchReader(io.BytesIO(XML), chunk_size=1000) as f:
+            events = list(parse(f))
+        self.assertEqual(events, list(parse(io.BytesIO(XML))))
+
+    def test_prefetch_filename(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'test.xml')
+            with open(filename, 'wb') as f:
+                f.write(XML)
+            with PrefetchReader(filename, chunk_size=1000) as f:
+                self.assertEqual(f.read(), XML)
+
+    def test_prefetch_close_early(self):
+        f = PrefetchReader(io.BytesIO(XML), chunk_size=10, queue_depth=1)
+        self.assertEqual(f.read(5), b'<doc>')
+        f.close()
+
+    def test_write_behind(self):
+        out = io.BytesIO()
+        with WriteBehind(out, chunk_size=100, queue_depth=2) as target:
+            XmlWriter(target).write_events(parse(io.BytesIO(XML)))
+        self.assertEqual(out.getvalue(), XML)
+
+    def test_write_behind_filename(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'test.xml')
+            with WriteBehind(filename) as target:
+                XmlWriter(target).write_events(parse(io.BytesIO(XML)))
+            with open(filename, 'rb') as f:
+                self.assertEqual(f.read(), XML)
+
+    def test_write_behind_error(self):
+        target = WriteBehind(_FailingTarget(), chunk_size=10)
+        target.write(b'<doc>hello, world</doc>')
+        with self.assertRaisesRegex(IOError, 'disk full'):
+            target.flush()
+        with self.assertRaisesRegex(IOError, 'disk full'):
+            target.write(b'more')
+        with self.assertRaisesRegex(IOError, 'disk full'):
+            target.close()
+
+    def test_write_behind_error_is_sticky(self):
+        out = _FlakyTarget()
+        target = WriteBehind(out, chunk_size=1)
+        target.write(b'A')
+        target.write(b'B')
+        with self.assertRaisesRegex(IOError, 'transient failure'):
+            target.flush()
+        with self.assertRaisesRegex(IOError, 'transient failure'):
+            target.write(b'C')
+        with self.assertRaisesRegex(IOError, 'transient failure'):
+            target.close()
+        self.assertEqual(out.data, [b'A'])
+
+    def test_prefetch_error_is_sticky(self):
+        with PrefetchReader(_FailingSource(), chunk_size=5) as f:
+            self.assertEqual(f.read(5), b'<doc>')
+            with self.assertRaisesRegex(IOError, 'connection reset'):
+                f.read(5)
+            with self.assertRaisesRegex(IOError, 'connection reset'):
+                f.read(5)
+            with self.assertRaisesRegex(IOError, 'connection reset'):
+                f.read()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 from lxmlx.xml_writer import xml_escape_attr, xml_escape_text, \
     validate_xml_name, validate_xml_text
+from lxmlx.validate import validate_xml_texts, xml_escape_texts, \
+    xml_escape_attrs
 import io
 import lxml.etree as et
 import itertools
@@ -119,3 +121,19 @@ class TestXmlEncode(unittest.TestCase):
             with self.assertRaisesRegex(RuntimeError, 'invalid XML character: .* at offset 5'):
                 print(x)
                 validate_xml_text('text ' + chr(x))
+
+    def test05(self):
+        texts = ['a<b', '', '\r&>', 'plain']
+        self.assertEqual(xml_escape_texts(texts), [xml_escape_text(x) for x in texts])
+        self.assertEqual(xml_escape_texts([]), [])
+        self.assertEqual(xml_escape_texts(['<']), ['&lt;'])
+
+        values = ['"\t\n', '', '<&>', 'plain']
+        self.assertEqual(xml_escape_attrs(values), [xml_escape_attr(x) for x in values])
+
+    def test05a(self):
+        validate_xml_texts([])
+        validate_xml_texts(['hello', '', 'world'])
+
+        with self.assertRaisesRegex(RuntimeError, 'invalid XML character: .* at offset 2'):
+            validate_xml_texts(['hello', '', 'wo\x01rld'])
@@ -83,6 +83,30 @@ class TestXmlWriter(unittest.TestCase):
     def test08(self):
         self._test_roundtrip(b'<root xmlns:a="ns-a"><a:child a:lang="en"/></root>')
 
+    def test09(self):
+        xml = et.fromstring(b'<root>' + b''.join(b'<p>&lt;%d&amp;</p>tail' % i for i in range(10)) + b'</root>')
+
+        w = XmlWriterHelper()
+        w.write_events(scan(xml), batch_size=3)
+        self.assertEqual(w.data, et.tostring(xml))
+
+    def test10(self):
+        w = XmlWriterHelper()
+        with self.assertRaisesRegex(RuntimeError, 'invalid XML character'):
+            w.write_enter('root', attrib={'a': 'hello\x01'})
+
+    def test11(self):
+        events = [
+            dict(type='enter', tag='a'),
+            dict(type='text',  text='ok'),
+            dict(type='text',  text='bad\x01'),
+            dict(type='exit'),
+        ]
+        w = XmlWriterHelper()
+        with self.assertRaisesRegex(RuntimeError, 'invalid XML character'):
+            w.write_events(events)
+        self.assertEqual(w.data, b'<a>ok')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,108 @@
+"""
+Character offset index over event stream.
+
+Flattened document text is the concatenation of all TEXT events (what
+`text_of` returns). Offsets do not depend on how text is split into events,
+so streams before and after `merge_text` produce the same index.
+"""
+import array
+import bisect
+from lxmlx.event import ENTER, EXIT, TEXT
+
+
+class TextIndex:
+    """Element offsets into the flattened document text.
+
+    Elements are numbered 0, 1, 2, ... in document order (order of their
+    ENTER events). Spans are half-open: element `i` covers
+    `text[start:end]`."""
+
+    def __init__(self, text, elements, starts, ends, parents, seg_offsets, seg_elements):
+        self.text = text
+        self._elements = elements
+        self._starts = starts
+        self._ends = ends
+        self._parents = parents
+        self._seg_offsets = seg_offsets
+        self._seg_elements = seg_elements
+
+    def __len__(self):
+        return len(self._elements)
+
+    def element(self, i):
+        """ENTER event of element `i`"""
+        return self._elements[i]
+
+    def span(self, i):
+        """(start, end) offsets of element `i`"""
+        return self._starts[i], self._ends[i]
+
+    def parent(self, i):
+        """index of the parent of element `i`, or None for the root"""
+        p = self._parents[i]
+        return None if p < 0 else p
+
+    def text_of(self, i):
+        """text content of element `i`"""
+        return self.text[self._starts[i]:self._ends[i]]
+
+    def innermost(self, offset):
+        """index of the innermost element that contains character at `offset`,
+        or None if this character is not inside any element. O(log n)"""
+        if offset < 0 or offset >= len(self.text):
+            raise IndexError('offset out of range: ' + str(offset))
+        k = bisect.bisect_right(self._seg_offsets, offset) - 1
+        if k < 0:
+            return None
+        i = self._seg_elements[k]
+        return None if i < 0 else i
+
+
+def index_text(events):
+    """builds `TextIndex` in a single pass over the event stream"""
+
+    chunks = []
+    elements = []
+    starts = array.array('q')
+    ends = array.array('q')
+    parents = array.array('q')
+
+    # innermost element changes only at ENTER/EXIT, record it as a list of
+    # segments (offset where segment starts, innermost element index)
+    seg_offsets = array.array('q')
+    seg_elements = array.array('q')
+
+    stack = []
+    offset = 0
+    for obj in events:
+        if obj['type'] == TEXT:
+            chunks.append(obj['text'])
+            offset += len(obj['text'])
+            continue
+
+        if obj['type'] == ENTER:
+            i = len(elements)
+            elements.append(obj)
+            starts.append(offset)
+            ends.append(offset)
+            parents.append(stack[-1] if stack else -1)
+            stack.append(i)
+        elif obj['type'] == EXIT:
+            if not stack:
+                raise RuntimeError('Unbalanced XML event stream')
+            ends[stack.pop()] = offset
+        else:
+            continue
+
+        current = stack[-1] if stack else -1
+        if seg_offsets and seg_offsets[-1] == offset:
+            seg_elements[-1] = current
+        else:
+            seg_offsets.append(offset)
+            seg_elements.append(current)
+
+    if stack:
+        raise RuntimeError('Unbalanced XML event stream')
+
+    return TextIndex(''.join(chunks), elements, starts, ends, parents,
+        seg_offsets, seg_elements)
@@ -0,0 +1,195 @@
+"""
+Background-thread I/O, to overlap slow reads and writes (e.g. on network
+filesystems) with parsing, transformation and serialization.
+
+    with PrefetchReader('input.xml') as source, WriteBehind('output.xml') as target:
+        XmlWriter(target).write_events(parse(source))
+
+Both classes move data between the threads in large chunks through a
+bounded queue, hence memory use is limited to about
+`chunk_size * (queue_depth + 2)` bytes.
+"""
+import threading
+import queue
+
+DEFAULT_CHUNK_SIZE  = 1024 * 1024
+DEFAULT_QUEUE_DEPTH = 4
+
+
+class PrefetchReader:
+    """Binary file-like object, that reads `source` ahead in a background
+    thread. `source` is a filename or a binary file object.
+
+    Can be passed to `lxmlx.event.parse` instead of a filename. Error in
+    reading `source` is re-raised by this and every subsequent `read` call."""
+
+    def __init__(self, source, chunk_size=DEFAULT_CHUNK_SIZE, queue_depth=DEFAULT_QUEUE_DEPTH):
+        if isinstance(source, str):
+            self._source = open(source, 'rb')
+            self._owned = True
+        else:
+            self._source = source
+            self._owned = False
+        self._chunk_size = chunk_size
+        self._queue = queue.Queue(maxsize=queue_depth)
+        self._stop = threading.Event()
+        self._buffer = b''
+        self._offset = 0
+        self._eof = False
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                chunk = self._source.read(self._chunk_size)
+                self._queue.put(chunk)
+                if not chunk:
+                    break
+        except BaseException as e:
+            self._queue.put(e)
+
+    def _next_chunk(self):
+        if self._error is not None:
+            raise self._error
+        chunk = self._queue.get()
+        if isinstance(chunk, BaseException):
+            # reader thread is gone: keep failing instead of looking like EOF
+            self._error = chunk
+            raise chunk
+        if not chunk:
+            self._eof = True
+        self._buffer = chunk
+        self._offset = 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            parts = [self._buffer[self._offset:]]
+            while not self._eof:
+                self._next_chunk()
+                parts.append(self._buffer)
+            self._buffer = b''
+            self._offset = 0
+            return b''.join(parts)
+
+        parts = []
+        while size > 0:
+            if self._offset >= len(self._buffer):
+                if self._eof:
+                    break
+                self._next_chunk()
+            data = self._buffer[self._offset:self._offset+size]
+            self._offset += len(data)
+            size -= len(data)
+            parts.append(data)
+
+        return parts[0] if len(parts) == 1 else b''.join(parts)
+
+    def readable(self):
+        return True
+
+    def close(self):
+        self._stop.set()
+        while self._thread.is_alive():
+            try:  # unblock reader thread
+                self._queue.get(timeout=0.01)
+            except queue.Empty:
+                pass
+        if self._owned:
+            self._source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *av):
+        self.close()
+
+
+class WriteBehind:
+    """Binary file-like object, that collects writes into large chunks and
+    writes them to `target` in a background thread. `target` is a filename or
+    a binary file object.
+
+    Use as `XmlWriter` target. Error in the background thread is sticky: no
+    more data is written to the target, and the error is re-raised by every
+    subsequent `write`, `flush` and `close` call. Target is closed only if it
+    was opened by `WriteBehind` (i.e. given as filename)."""
+
+    def __init__(self, target, chunk_size=DEFAULT_CHUNK_SIZE, queue_depth=DEFAULT_QUEUE_DEPTH):
+        if isinstance(target, str):
+            self._target = open(target, 'wb')
+            self._owned = True
+        else:
+            self._target = target
+            self._owned = False
+        self._chunk_size = chunk_size
+        self._queue = queue.Queue(maxsize=queue_depth)
+        self._pending = []
+        self._pending_size = 0
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            chunk = self._queue.get()
+            try:
+                if chunk is None:
+                    return
+                if self._error is None:
+                    self._target.write(chunk)
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _check(self):
+        if self._error is not None:
+            raise self._error
+
+    def _submit(self):
+        if self._pending:
+            self._queue.put(b''.join(self._pending))
+            self._pending = []
+            self._pending_size = 0
+
+    def write(self, data):
+        if self._closed:
+            raise ValueError('write to closed WriteBehind')
+        self._check()
+        self._pending.append(data)
+        self._pending_size += len(data)
+        if self._pending_size >= self._chunk_size:
+            self._submit()
+        return len(data)
+
+    def writable(self):
+        return True
+
+    def flush(self):
+        """waits until all data is written to the target"""
+        self._submit()
+        self._queue.join()
+        self._check()
+        if hasattr(self._target, 'flush'):
+            self._target.flush()
+
+    def close(self):
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+            if self._owned:
+                self._target.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *av):
+        self.close()
@@ -40,60 +40,103 @@ def validate_comment_text(text):
     if __COMMENT_TEXT_CHECK_PATTERN.search(text):
         raise RuntimeError('Comment text can not contain "--", nor end with a dash "-"')
 
-__INVALID_XML_CHARS = set(chr(x) for x in itertools.chain(
-    range(0x0, 0x8+1),
-    range(0xb, 0xc+1),
-    range(0xe, 0x1f+1),
-    range(0xd800, 0xdfff+1),
-    range(0xfffe, 0xffff+1)
-))
+# compiling large character classes takes a few milliseconds, hence they are
+# compiled on first use, not at import time
+__CHAR_CLASSES = {}
+
+def _char_class(name, ranges):
+    """regex matching any character from the list of (first, last) code point
+    ranges, compiled on first use and cached under `name`"""
+    pattern = __CHAR_CLASSES.get(name)
+    if pattern is None:
+        pattern = __CHAR_CLASSES[name] = re.compile('[' + ''.join(
+            re.escape(chr(s)) + '-' + re.escape(chr(e)) for s,e in ranges
+        ) + ']')
+    return pattern
+
+__INVALID_XML_CHAR_RANGES = [
+    (0x0, 0x8),
+    (0xb, 0xc),
+    (0xe, 0x1f),
+    (0xd800, 0xdfff),
+    (0xfffe, 0xffff)
+]
+
 
 def validate_xml_text(text):
     """validates XML text"""
-    bad_chars = __INVALID_XML_CHARS & set(text)
-    if bad_chars:
-        for offset,c in enumerate(text):
-            if c in bad_chars:
-                raise RuntimeError('invalid XML character: ' + repr(c) + ' at offset ' + str(offset))
-
-__INVALID_NAME_CHARS = set(chr(x) for x in itertools.chain(
-    range(0x0, 0x2c+1),
-    range(0x2f, 0x2f+1),
-    range(0x3b, 0x40+1),
-    range(0x5b, 0x5e+1),
-    range(0x60, 0x60+1),
-    range(0x7b, 0xb6+1),
-    range(0xb8, 0xbf+1),
-    range(0xd7, 0xd7+1),
-    range(0xf7, 0xf7+1),
-    range(0x37e, 0x37e+1),
-    range(0x2000, 0x200b+1),
-    range(0x200e, 0x203e+1),
-    range(0x2041, 0x206f+1),
-    range(0x2190, 0x2bff+1),
-    range(0x2ff0, 0x3000+1),
-    range(0xd800, 0xf8ff+1),
-    range(0xfdd0, 0xfdef+1),
-    range(0xfffe, 0xffff+1)
-))
-
-__INVALID_NAME_START_CHARS = set(chr(x) for x in itertools.chain(
-    range(0x2d, 0x2e+1),
-    range(0x30, 0x39+1),
-    range(0xb7, 0xb7+1),
-    range(0x300, 0x36f+1),
-    range(0x203f, 0x2040+1)
-))
+    mtc = _char_class('xml_char', __INVALID_XML_CHAR_RANGES).search(text)
+    if mtc is not None:
+        raise RuntimeError('invalid XML character: ' + repr(mtc.group()) + ' at offset ' + str(mtc.start()))
+
+def validate_xml_texts(texts):
+    """validates list of XML texts (in one regex pass)"""
+    mtc = _char_class('xml_char', __INVALID_XML_CHAR_RANGES).search(''.join(texts))
+    if mtc is not None:
+        offset = mtc.start()
+        for text in texts:
+            if offset < len(text):
+                break
+            offset -= len(text)
+        raise RuntimeError('invalid XML character: ' + repr(mtc.group()) + ' at offset ' + str(offset))
+
+# NUL is not a valid XML character, hence can not occur in validated text
+__BATCH_SEPARATOR = '\u0000'
+
+def xml_escape_texts(texts):
+    """escapes list of XML texts (in one regex pass). Texts must be valid
+    (see `validate_xml_texts`)"""
+    if len(texts) < 2:
+        return [xml_escape_text(text) for text in texts]
+    return xml_escape_text(__BATCH_SEPARATOR.join(texts)).split(__BATCH_SEPARATOR)
+
+def xml_escape_attrs(values):
+    """escapes list of XML attribute values (in one regex pass). Values must
+    be valid XML text (see `validate_xml_texts`)"""
+    if len(values) < 2:
+        return [xml_escape_attr(value) for value in values]
+    return xml_escape_attr(__BATCH_SEPARATOR.join(values)).split(__BATCH_SEPARATOR)
+
+__INVALID_NAME_CHAR_RANGES = [
+    (0x0, 0x2c),
+    (0x2f, 0x2f),
+    (0x3b, 0x40),
+    (0x5b, 0x5e),
+    (0x60, 0x60),
+    (0x7b, 0xb6),
+    (0xb8, 0xbf),
+    (0xd7, 0xd7),
+    (0xf7, 0xf7),
+    (0x37e, 0x37e),
+    (0x2000, 0x200b),
+    (0x200e, 0x203e),
+    (0x2041, 0x206f),
+    (0x2190, 0x2bff),
+    (0x2ff0, 0x3000),
+    (0xd800, 0xf8ff),
+    (0xfdd0, 0xfdef),
+    (0xfffe, 0xffff)
+]
+
+
+__INVALID_NAME_START_CHAR_RANGES = [
+    (0x2d, 0x2e),
+    (0x30, 0x39),
+    (0xb7, 0xb7),
+    (0x300, 0x36f),
+    (0x203f, 0x2040)
+]
+
 
 def validate_xml_name(name):
     """validates XML name"""
     if len(name) == 0:
         raise RuntimeError('empty XML name')
 
-    if __INVALID_NAME_CHARS & set(name):
+    if _char_class('name_char', __INVALID_NAME_CHAR_RANGES).search(name):
         raise RuntimeError('XML name contains invalid character')
 
-    if name[0] in __INVALID_NAME_START_CHARS:
+    if _char_class('name_start_char', __INVALID_NAME_START_CHAR_RANGES).match(name):
         raise RuntimeError('XML name starts with invalid character')
 
 if __name__ == '__main__':
@@ -184,18 +227,21 @@ if __name__ == '__main__':
     print(len(unicode_all-nc))
     print(len(unicode_all-ncs))
 
-    print(len(__INVALID_XML_CHARS))
-    print(len(__INVALID_NAME_CHARS))
-    print(len(__INVALID_NAME_START_CHARS))
+    def range_chars(ranges):
+        return set(itertools.chain.from_iterable(range(s, e+1) for s,e in ranges))
+
+    print(len(range_chars(__INVALID_XML_CHAR_RANGES)))
+    print(len(range_chars(__INVALID_NAME_CHAR_RANGES)))
+    print(len(range_chars(__INVALID_NAME_START_CHAR_RANGES)))
 
     print('invalid_xml_chars')
-    for s,e in to_ranges(__INVALID_XML_CHARS):
+    for s,e in to_ranges(range_chars(__INVALID_XML_CHAR_RANGES)):
         print('range('+hex(s)+',', hex(e)+'+1)')
 
     print('invalid_name_chars')
-    for s,e in to_ranges(__INVALID_NAME_CHARS):
+    for s,e in to_ranges(range_chars(__INVALID_NAME_CHAR_RANGES)):
         print('range('+hex(s)+',', hex(e)+'+1)')
 
     print('invalid_name_start_chars')
-    for s,e in to_ranges(__INVALID_NAME_START_CHARS):
+    for s,e in to_ranges(range_chars(__INVALID_NAME_START_CHAR_RANGES)):
         print('range('+hex(s)+',', hex(e)+'+1)')
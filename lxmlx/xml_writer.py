@@ -1,18 +1,28 @@
-import lxml.etree as et
 import re
 import itertools
 import contextlib
 from lxmlx.event import ENTER, EXIT, TEXT, COMMENT, PI
 from lxmlx.validate import validate_xml_text, validate_xml_name, \
     validate_pi_text, validate_comment_text, xml_escape_text, \
-    xml_escape_attr
+    xml_escape_attr, validate_xml_texts, xml_escape_texts, xml_escape_attrs
+from lxmlx.compression import CompressingWriter
 
 _QUAL_NAME = re.compile(r'{(.*?)}(.*)$')
 
 class XmlWriter:
-    """Incremental writer"""
-
-    def __init__(self, target=None, xml_declaration=False):
+    """Incremental writer.
+
+    If `compression` is set ('gzip', 'bz2', 'xz' or 'zstd'), output is
+    compressed in large chunks before it is written to the target, with
+    `compresslevel` and `compression_threads` (zstd only) passed to the codec.
+    Compressed stream must be finished by calling `close`."""
+
+    def __init__(self, target=None, xml_declaration=False, compression=None,
+            compresslevel=None, compression_threads=None):
+        self._compressor = None
+        if compression is not None:
+            target = self._compressor = CompressingWriter(target, compression,
+                level=compresslevel, threads=compression_threads)
         self._target = target
         self._tags = []
         self._empty = False
@@ -20,6 +30,17 @@ class XmlWriter:
         if xml_declaration:
             target.write(b"<?xml version='1.0' encoding='utf-8'?>\n")
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *av):
+        self.close()
+
+    def close(self):
+        """finishes compressed output (if any). Target is not closed"""
+        if self._compressor is not None:
+            self._compressor.close()
+
     def __push(self, tag, nsmap):
         self._tags.append(tag)
         self._nsmap.append(nsmap)
@@ -101,7 +122,9 @@ class XmlWriter:
             self._tags.append( (tag, tagname) )
 
             if attrib:
-                attrib = sorted( (resolver(x), xml_escape_attr(y)) for x,y in attrib.items() )
+                values = list(attrib.values())
+                validate_xml_texts(values)
+                attrib = sorted(zip( (resolver(x) for x in attrib.keys()), xml_escape_attrs(values) ))
 
             # first, declare all namaspaces
             for ns, prefix in resolver():  # FIXME: hackish?
@@ -155,18 +178,51 @@ class XmlWriter:
         validate_xml_text(text)
         self.__write(xml_escape_text(text))
 
-    def write_events(self, events, nsmap=None):
-
-        for obj in events:
-            if obj['type'] == ENTER:
-                self.write_enter(obj['tag'], attrib=obj.get('attrib'), nsmap=nsmap)
-            elif obj['type'] == EXIT:
-                self.write_exit()
-            elif obj['type'] == TEXT:
-                self.write_text(obj['text'])
-            elif obj['type'] == COMMENT:
-                self.write_comment(obj['text'])
-            elif obj['type'] == PI:
-                self.write_pi(obj['target'], obj.get('text'))
-            else:
-                assert False, obj
+    def __write_escaped_text(self, text):
+        if self._empty:
+            self.__write('>')
+            self._empty = False
+        self.__write(text)
+
+    def write_event(self, obj, nsmap=None):
+        if obj['type'] == ENTER:
+            self.write_enter(obj['tag'], attrib=obj.get('attrib'), nsmap=nsmap)
+        elif obj['type'] == EXIT:
+            self.write_exit()
+        elif obj['type'] == TEXT:
+            self.write_text(obj['text'])
+        elif obj['type'] == COMMENT:
+            self.write_comment(obj['text'])
+        elif obj['type'] == PI:
+            self.write_pi(obj['target'], obj.get('text'))
+        else:
+            assert False, obj
+
+    def write_events(self, events, nsmap=None, batch_size=1024):
+        # text of each batch of events is validated and escaped in one go,
+        # saving per-event overhead on text-heavy documents
+        events = iter(events)
+        while True:
+            batch = list(itertools.islice(events, batch_size))
+            if not batch:
+                break
+
+            texts = [obj['text'] for obj in batch if obj['type'] == TEXT]
+            try:
+                validate_xml_texts(texts)
+                valid = True
+            except RuntimeError:
+                valid = False
+            if not valid:
+                # write events one by one, so that everything before the
+                # invalid text is written out before the error is raised
+                for obj in batch:
+                    self.write_event(obj, nsmap=nsmap)
+                continue
+            escaped = iter(xml_escape_texts(texts))
+
+            for obj in batch:
+                if obj['type'] == TEXT:
+                    self.__write_escaped_text(next(escaped))
+                else:
+                    self.write_event(obj, nsmap=nsmap)
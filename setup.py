@@ -34,5 +34,11 @@ setup(
         'Topic :: Software Development :: Libraries :: Python Modules',
     ],
     packages=[NAME],
-    install_requires=['lxml']
+    install_requires=['lxml'],
+    extras_require={
+        'zstd': ['zstandard'],
+    },
+    entry_points={
+        'console_scripts': ['lxmlx=lxmlx.cli:main'],
+    },
 )